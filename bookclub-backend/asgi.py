@@ -0,0 +1,22 @@
+"""ASGI entry point, for serving under an ASGI server.
+
+    pip install asgiref uvicorn
+    uvicorn asgi:app --workers 4
+
+The app is synchronous. Each request runs on one of ASGI_THREADS (default 32)
+threads per process, and its response is sent chunk by chunk as it is
+produced. An open event stream holds its thread until the client leaves, as it
+does under gunicorn. So SSE_MAX_STREAMS is lowered to keep
+ASGI_STREAM_RESERVED_THREADS (default half) for other requests.
+"""
+import os
+
+from asgi_adapter import ThreadPoolWsgiToAsgi
+from wsgi import app as wsgi_app
+
+THREADS = int(os.environ.get('ASGI_THREADS', 32))
+STREAM_RESERVED_THREADS = int(os.environ.get('ASGI_STREAM_RESERVED_THREADS', max(THREADS // 2, 1)))
+
+wsgi_app.config['SSE_MAX_STREAMS'] = min(wsgi_app.config['SSE_MAX_STREAMS'],
+                                         max(THREADS - STREAM_RESERVED_THREADS, 0))
+app = ThreadPoolWsgiToAsgi(wsgi_app, THREADS)
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+
+from asgiref.wsgi import WsgiToAsgiInstance
+
+
+class ThreadPoolWsgiToAsgi:
+    """Serve a WSGI app to an ASGI server, running each request on a pool of `threads` threads.
+
+    asgiref's WsgiToAsgi runs every request on one shared thread, so a single
+    open event stream blocks all other requests. It also never closes the
+    response and keeps iterating after the client has left. Here each request
+    gets a pool thread and its chunks are sent as the app yields them. The
+    response stops at the first chunk after a disconnect and is always closed.
+    """
+
+    def __init__(self, wsgi_application, threads):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='asgi')
+
+    async def __call__(self, scope, receive, send):
+        await _Instance(self.wsgi_application, self.executor)(scope, receive, send)
+
+
+class _Instance(WsgiToAsgiInstance):
+    # Reuses asgiref's environ building and start_response
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        self.executor = executor
+        self.disconnected = threading.Event()
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError('WSGI wrapper received a non-HTTP scope')
+        self.scope = scope
+        loop = asyncio.get_running_loop()
+        self.sync_send = lambda message: asyncio.run_coroutine_threadsafe(send(message), loop).result()
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            watcher = asyncio.ensure_future(self._watch_disconnect(receive))
+            try:
+                await loop.run_in_executor(self.executor, self.run_wsgi_app, body)
+            finally:
+                watcher.cancel()
+
+    async def _watch_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        self.disconnected.set()
+
+    def run_wsgi_app(self, body):
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # Too many duplicate headers
+            self.sync_send({'type': 'http.response.start', 'status': 400,
+                            'headers': [(b'content-type', b'text/plain')]})
+            self.sync_send({'type': 'http.response.body', 'body': b'Bad Request'})
+            return
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in response:
+                if self.disconnected.is_set():
+                    return
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                if output:
+                    self.sync_send({'type': 'http.response.body', 'body': output, 'more_body': True})
+            if not self.response_started:
+                self.response_started = True
+                self.sync_send(self.response_start)
+            self.sync_send({'type': 'http.response.body'})
+        finally:
+            # Runs the response's close callbacks, such as releasing an event stream's slot
+            if hasattr(response, 'close'):
+                response.close()
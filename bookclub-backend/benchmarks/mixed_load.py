@@ -0,0 +1,101 @@
+"""Compare read/write throughput of the engine profiles under a mixed load.
+
+Each worker is a separate process with its own app and engine, like a
+gunicorn worker, and drives the routes through the Flask test client:
+reads are GET /discussions pages, writes are POST /discussions.
+
+    python -m benchmarks.mixed_load --workers 8 --seconds 10 --write-ratio 0.2
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.seed import create_database, default_counts, load_app
+
+
+def _worker(path, profile, seconds, write_ratio, counts, results):
+    app = load_app(path, profile)
+    client = app.test_client()
+    rng = random.Random(os.getpid())
+    reads, writes, errors = [], [], 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        if rng.random() < write_ratio:
+            response = client.post('/discussions', json={
+                'content': 'benchmark', 'date': '2025-01-01',
+                'book_id': rng.randint(1, counts['books']), 'club_id': rng.randint(1, counts['clubs'])})
+            latencies = writes
+        else:
+            response = client.get(f'/discussions?after={rng.randint(0, counts["discussions"])}&limit=50')
+            latencies = reads
+        if response.status_code >= 500:
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+    results.put((reads, writes, errors))
+
+
+def run_profile(template, profile, workers, seconds, write_ratio, counts):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bookclub.db')
+        shutil.copy(template, path)
+        context = multiprocessing.get_context('spawn')
+        results = context.Queue()
+        processes = [context.Process(target=_worker, args=(path, profile, seconds, write_ratio, counts, results))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        reads, writes, errors = [], [], 0
+        for _ in processes:
+            r, w, e = results.get()
+            reads += r
+            writes += w
+            errors += e
+        for process in processes:
+            process.join()
+
+    def p95(latencies):
+        return statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else 0.0
+
+    return {
+        'profile': profile,
+        'reads_per_s': len(reads) / seconds,
+        'writes_per_s': len(writes) / seconds,
+        'read_p95_ms': p95(reads),
+        'write_p95_ms': p95(writes),
+        'errors': errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--rows', type=int, default=10000, help='discussions to seed')
+    parser.add_argument('--profiles', nargs='+', default=['default', 'production'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        template = os.path.join(directory, 'template.db')
+        context = multiprocessing.get_context('spawn')
+        counts = default_counts(args.rows)
+        seeder = context.Process(target=create_database, args=(template, counts))
+        seeder.start()
+        seeder.join()
+
+        print(f'{"profile":<12} {"reads/s":>9} {"writes/s":>9} {"read p95":>9} {"write p95":>10} {"errors":>7}')
+        for profile in args.profiles:
+            result = run_profile(template, profile, args.workers, args.seconds, args.write_ratio, counts)
+            print(f'{profile:<12} {result["reads_per_s"]:>9.0f} {result["writes_per_s"]:>9.0f} '
+                  f'{result["read_p95_ms"]:>7.1f}ms {result["write_p95_ms"]:>8.1f}ms {result["errors"]:>7}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Measure POST /login throughput at each password hashing cost.
+
+    python -m benchmarks.password_hashing --concurrency 16 --seconds 5
+    python -m benchmarks.password_hashing --methods scrypt:16384:8:1 pbkdf2:sha256:600000 --workers 4
+
+Every user's password is re-hashed with the method under test first, so the
+logins measure verification only, not the rehash-on-login path.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.seed import create_database, load_app
+
+DEFAULT_METHODS = ('pbkdf2:sha256:100000', 'pbkdf2:sha256:600000',
+                   'scrypt:16384:8:1', 'scrypt:32768:8:1', 'scrypt:65536:8:1')
+USERS = 100
+
+
+def run_method(app, method, concurrency, seconds):
+    from sqlalchemy import update
+    from werkzeug.security import generate_password_hash
+    from models import db, User
+
+    app.config['PASSWORD_HASH_METHOD'] = method
+    start = time.perf_counter()
+    password_hash = generate_password_hash('password', method)
+    single = time.perf_counter() - start
+    with app.app_context():
+        db.session.execute(update(User).values(password=password_hash))
+        db.session.commit()
+
+    latencies, rejected = [], []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(index):
+        client = app.test_client()
+        rng = random.Random(index)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = client.post('/login', json={'email': f'user{rng.randint(1, USERS)}@example.com',
+                                                   'password': 'password'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code == 503:
+                    rejected.append(elapsed)
+                elif response.status_code == 200:
+                    latencies.append(elapsed)
+                else:
+                    raise RuntimeError(f'POST /login returned {response.status_code}')
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    cores = min(app.config['PASSWORD_HASH_WORKERS'], os.cpu_count() or 1)
+    return {
+        'hash_ms': single * 1000,
+        'logins_per_s': len(latencies) / seconds,
+        'per_core': len(latencies) / seconds / cores,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        'rejected': len(rejected),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--methods', nargs='+', default=DEFAULT_METHODS,
+                        help='werkzeug.security methods with their cost parameters')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent login requests')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--workers', type=int, help='hashing pool size (default: PASSWORD_HASH_WORKERS)')
+    parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bookclub.db')
+        counts = {'users': USERS, 'clubs': 2, 'books': 10, 'memberships': 0, 'discussions': 0}
+        create_database(path, counts)
+        app = load_app(path)
+        hasher = app.extensions['password_hasher']
+        hasher.executor.shutdown()
+        app.config['PASSWORD_HASH_WORKERS'] = args.workers or app.config['PASSWORD_HASH_WORKERS']
+        app.config['PASSWORD_HASH_QUEUE'] = 4 * app.config['PASSWORD_HASH_WORKERS']
+        app.config['PASSWORD_HASH_POOL'] = args.pool
+        hasher.init_app(app)
+
+        print(f'{app.config["PASSWORD_HASH_WORKERS"]} {args.pool} workers on {os.cpu_count()} cores, '
+              f'{args.concurrency} concurrent logins')
+        print(f'{"method":<24} {"hash":>8} {"logins/s":>9} {"per core":>9} {"p50":>9} {"p95":>9} {"503s":>6}')
+        for method in args.methods:
+            result = run_method(app, method, args.concurrency, args.seconds)
+            print(f'{method:<24} {result["hash_ms"]:>6.1f}ms {result["logins_per_s"]:>9.1f} '
+                  f'{result["per_core"]:>9.1f} {result["p50_ms"]:>7.1f}ms {result["p95_ms"]:>7.1f}ms '
+                  f'{result["rejected"]:>6}')
+        hasher.executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,317 @@
+"""Drive every route against a seeded database and report throughput, latency and SQL query counts.
+
+    python -m benchmarks.run --discussions 100000 --concurrency 8 --out results.json
+    python -m benchmarks.run --db seeded.db --server --out new.json --compare results.json
+
+The database is copied (or seeded) into a temporary directory first, so the
+write scenarios never touch the original. Requests go through the Flask test
+client, or with --server through a local threaded WSGI server over HTTP.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+from benchmarks.seed import create_database, default_counts, load_app
+
+QUERY_COUNT_HEADER = 'X-SQL-Queries'
+
+# path and body are called with (rng, state) and return the URL / JSON body;
+# creates is (resource, response key) for POSTs whose new ids a DELETE scenario reuses
+Scenario = namedtuple('Scenario', 'name, method, path, body, full_table, creates', defaults=(None,))
+
+
+def _pick(table):
+    return lambda rng, state: rng.randint(1, state['max_id'][table])
+
+
+def scenarios():
+    user, club, book, discussion = (_pick(table) for table in ('user', 'club', 'book', 'discussion'))
+
+    def created(resource):
+        # Deletes consume the rows the matching POST scenario created
+        return lambda rng, state: f'/{resource}/{state["created"][resource].pop()}'
+
+    def new_user(rng, state):
+        return {'name': 'Bench', 'email': f'bench{rng.getrandbits(64)}@example.com', 'password': 'password'}
+
+    def new_book(rng, state):
+        return {'title': 'Bench', 'author': 'Bench', 'genre': 'Fiction', 'user_id': user(rng, state)}
+
+    def new_discussion(rng, state):
+        return {'content': 'bench', 'date': '2025-06-01', 'book_id': book(rng, state), 'club_id': club(rng, state)}
+
+    def new_membership(rng, state):
+        user_id, club_id = state['free_memberships'].pop()
+        return {'user_id': user_id, 'club_id': club_id, 'role': 'member'}
+
+    return [
+        Scenario('GET /users', 'GET', lambda rng, state: '/users', None, True),
+        Scenario('GET /users?after', 'GET', lambda rng, state: f'/users?after={user(rng, state)}&limit=50', None, False),
+        Scenario('GET /users/<id>', 'GET', lambda rng, state: f'/users/{user(rng, state)}', None, False),
+        Scenario('POST /users', 'POST', lambda rng, state: '/users', new_user, False, ('users', 'user')),
+        Scenario('PUT /users/<id>', 'PUT', lambda rng, state: f'/users/{user(rng, state)}',
+                 lambda rng, state: {'name': 'Renamed'}, False),
+        Scenario('DELETE /users/<id>', 'DELETE', created('users'), None, False),
+        Scenario('GET /clubs', 'GET', lambda rng, state: '/clubs', None, True),
+        Scenario('GET /clubs/<id>', 'GET', lambda rng, state: f'/clubs/{club(rng, state)}', None, False),
+        Scenario('POST /clubs', 'POST', lambda rng, state: '/clubs',
+                 lambda rng, state: {'name': 'Bench', 'description': 'bench'}, False, ('clubs', 'club')),
+        Scenario('PUT /clubs/<id>', 'PUT', lambda rng, state: f'/clubs/{club(rng, state)}',
+                 lambda rng, state: {'description': 'changed'}, False),
+        Scenario('DELETE /clubs/<id>', 'DELETE', created('clubs'), None, False),
+        Scenario('GET /clubs/<id>/discussions', 'GET',
+                 lambda rng, state: f'/clubs/{club(rng, state)}/discussions?from=2025-{rng.randint(1, 12):02d}-01&limit=50',
+                 None, False),
+        Scenario('GET /books', 'GET', lambda rng, state: '/books', None, True),
+        Scenario('GET /books?after', 'GET', lambda rng, state: f'/books?after={book(rng, state)}&limit=50', None, False),
+        Scenario('GET /books/<id>', 'GET', lambda rng, state: f'/books/{book(rng, state)}', None, False),
+        Scenario('POST /books', 'POST', lambda rng, state: '/books', new_book, False, ('books', 'book')),
+        Scenario('PUT /books/<id>', 'PUT', lambda rng, state: f'/books/{book(rng, state)}',
+                 lambda rng, state: {'genre': 'Poetry'}, False),
+        Scenario('DELETE /books/<id>', 'DELETE', created('books'), None, False),
+        Scenario('POST /books/bulk', 'POST', lambda rng, state: '/books/bulk',
+                 lambda rng, state: [new_book(rng, state) for _ in range(100)], False),
+        Scenario('GET /memberships', 'GET', lambda rng, state: '/memberships', None, True),
+        Scenario('GET /memberships?club_id', 'GET',
+                 lambda rng, state: f'/memberships?club_id={club(rng, state)}', None, False),
+        Scenario('POST /memberships', 'POST', lambda rng, state: '/memberships', new_membership, False),
+        Scenario('GET /discussions', 'GET', lambda rng, state: '/discussions', None, True),
+        Scenario('GET /discussions?after', 'GET',
+                 lambda rng, state: f'/discussions?after={discussion(rng, state)}&limit=50', None, False),
+        Scenario('GET /discussions/<id>', 'GET', lambda rng, state: f'/discussions/{discussion(rng, state)}', None, False),
+        Scenario('POST /discussions', 'POST', lambda rng, state: '/discussions', new_discussion, False,
+                 ('discussions', 'discussion')),
+        Scenario('PUT /discussions/<id>', 'PUT', lambda rng, state: f'/discussions/{discussion(rng, state)}',
+                 lambda rng, state: {'content': 'edited'}, False),
+        Scenario('DELETE /discussions/<id>', 'DELETE', created('discussions'), None, False),
+        Scenario('GET /search', 'GET',
+                 lambda rng, state: f'/search?q={rng.choice(("war", "love", "sea", "city"))}&limit=20', None, False),
+    ]
+
+
+class TestClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        return response.status_code, response.get_data(), response.headers
+
+
+class HTTPClient:
+    def __init__(self, port):
+        self.port = port
+
+    def request(self, method, path, body):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port)
+        try:
+            payload = json.dumps(body) if body is not None else None
+            connection.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, response.read(), response.headers
+        finally:
+            connection.close()
+
+
+def count_queries(app):
+    """Report the number of SQL statements each request ran (as counted by metrics.py) in a response header."""
+    from flask import g
+
+    @app.after_request
+    def add_header(response):
+        response.headers[QUERY_COUNT_HEADER] = str(g.get('sql_statements', 0))
+        return response
+
+
+def database_state(app, free_memberships):
+    from sqlalchemy import func, select
+    from models import db, User, Club, Membership, Book, Discussion
+
+    with app.app_context():
+        max_id = {model.__tablename__: db.session.execute(select(func.max(model.id))).scalar() or 1
+                  for model in (User, Club, Book, Discussion)}
+        # (user, club) pairs that are not members yet, for POST /memberships
+        pairs = []
+        for user_id in range(1, max_id['user'] + 1):
+            taken = set(db.session.execute(select(Membership.club_id).where(Membership.user_id == user_id)).scalars())
+            pairs += [(user_id, club_id) for club_id in range(1, max_id['club'] + 1) if club_id not in taken]
+            if len(pairs) >= free_memberships:
+                break
+        return {'max_id': max_id, 'created': defaultdict(list), 'free_memberships': pairs}
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def run_scenario(scenario, make_client, state, requests, concurrency, random_seed):
+    latencies, queries, errors = [], [], []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+
+    def worker(thread_index):
+        client = make_client()
+        rng = random.Random(f'{random_seed}:{scenario.name}:{thread_index}')
+        for _ in range(per_thread[thread_index]):
+            try:
+                with lock:
+                    path = scenario.path(rng, state)
+                    body = scenario.body(rng, state) if scenario.body else None
+                start = time.perf_counter()
+                status, data, headers = client.request(scenario.method, path, body)
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                # Counted like a failed request, so it shows up in the results and in --compare
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                if status >= 400:
+                    errors.append(status)
+                    continue
+                latencies.append(elapsed)
+                queries.append(int(headers.get(QUERY_COUNT_HEADER, 0)))
+                if scenario.creates:
+                    resource, key = scenario.creates
+                    state['created'][resource].append(json.loads(data)[key]['id'])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'throughput_rps': len(latencies) / wall if wall else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        'mean_ms': statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        'mean_queries': statistics.fmean(queries) if queries else 0.0,
+        'max_queries': max(queries, default=0),
+    }
+
+
+def compare(previous, current, tolerance):
+    """Print per-endpoint changes and return the names that regressed."""
+    regressions = []
+    print(f'\n{"endpoint":<28} {"p95 before":>11} {"p95 now":>9} {"change":>8} {"queries":>12}')
+    for name, now in current['endpoints'].items():
+        before = previous['endpoints'].get(name)
+        if before is None:
+            continue
+        change = now['p95_ms'] / before['p95_ms'] - 1 if before['p95_ms'] else 0.0
+        regressed = (change > tolerance or now['mean_queries'] > before['mean_queries'] + 0.01
+                     or now['errors'] > before['errors'])
+        if regressed:
+            regressions.append(name)
+        print(f'{name:<28} {before["p95_ms"]:>9.1f}ms {now["p95_ms"]:>7.1f}ms {change:>+7.0%} '
+              f'{before["mean_queries"]:>5.1f} -> {now["mean_queries"]:<4.1f}{"  REGRESSED" if regressed else ""}')
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--db', help='seeded database to copy (see benchmarks.seed)')
+    source.add_argument('--discussions', type=int, default=10000, help='seed a fresh database of this scale')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint')
+    parser.add_argument('--full-table-requests', type=int, default=5,
+                        help='requests per endpoint that lists a whole table')
+    parser.add_argument('--concurrency', type=int, default=1)
+    parser.add_argument('--server', action='store_true', help='go through a local WSGI server instead of the test client')
+    parser.add_argument('--profile', default='default', help='engine profile (BOOKCLUB_DB_PROFILE)')
+    parser.add_argument('--cache', action='store_true', help='leave the response cache on')
+    parser.add_argument('--only', help='run only endpoints whose name contains this text')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 slowdown before failing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bookclub.db')
+        if args.db:
+            shutil.copy(args.db, path)
+        else:
+            create_database(path, default_counts(args.discussions), args.seed)
+        app = load_app(path, args.profile, cache=args.cache)
+        count_queries(app)
+        state = database_state(app, args.requests)
+        selected = [scenario for scenario in scenarios() if not args.only or args.only in scenario.name]
+        if any(scenario.name == 'POST /memberships' for scenario in selected) \
+                and len(state['free_memberships']) < args.requests:
+            raise SystemExit(f'Only {len(state["free_memberships"])} (user, club) pairs are not members yet, '
+                             f'POST /memberships needs {args.requests}; seed fewer memberships or more clubs')
+
+        server = None
+        if args.server:
+            from werkzeug.serving import make_server
+            server = make_server('127.0.0.1', 0, app, threaded=True)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            make_client = lambda: HTTPClient(server.server_port)  # noqa: E731
+        else:
+            make_client = lambda: TestClient(app)  # noqa: E731
+
+        results = {}
+        print(f'{"endpoint":<28} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8} {"errors":>7}')
+        for scenario in selected:
+            requests = args.full_table_requests if scenario.full_table else args.requests
+            result = run_scenario(scenario, make_client, state, requests, args.concurrency, args.seed)
+            results[scenario.name] = result
+            print(f'{scenario.name:<28} {result["throughput_rps"]:>8.1f} {result["p50_ms"]:>6.1f}ms '
+                  f'{result["p95_ms"]:>6.1f}ms {result["p99_ms"]:>6.1f}ms {result["mean_queries"]:>8.1f} '
+                  f'{result["errors"]:>7}')
+        if server is not None:
+            server.shutdown()
+
+    current = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'mode': 'server' if args.server else 'test_client',
+            'concurrency': args.concurrency,
+            'profile': args.profile,
+            'cache': args.cache,
+            'rows': {table: count for table, count in state['max_id'].items()},
+        },
+        'endpoints': results,
+    }
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), current, args.tolerance)
+        if regressions:
+            raise SystemExit(f'{len(regressions)} endpoint(s) regressed: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
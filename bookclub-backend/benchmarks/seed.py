@@ -0,0 +1,129 @@
+"""Create a migrated database filled with synthetic users, clubs, books, memberships and discussions.
+
+    python -m benchmarks.seed /tmp/bench.db --discussions 1000000
+
+Table sizes default to fractions of --discussions and can each be overridden.
+"""
+import argparse
+import datetime
+import os
+import random
+
+# Rows per executemany when seeding
+SEED_CHUNK_SIZE = 10000
+
+GENRES = ('Fiction', 'History', 'Science', 'Poetry', 'Fantasy', 'Biography', 'Mystery', 'Philosophy')
+WORDS = ('book', 'chapter', 'author', 'ending', 'character', 'theme', 'plot', 'style', 'war', 'love',
+         'history', 'science', 'journey', 'mystery', 'family', 'power', 'memory', 'city', 'sea', 'time')
+
+
+def load_app(path, profile='default', cache=False):
+    """Create an app against the database at `path`."""
+    from app import create_app
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.abspath(path)}',
+                      'BOOKCLUB_DB_PROFILE': profile})
+    if not cache:
+        # Measure the routes, not the response cache
+        app.config['RESPONSE_CACHE_MAX_BYTES'] = 0
+    return app
+
+
+def default_counts(discussions):
+    users = max(discussions // 10, 10)
+    # At least 10 clubs, so users are not members of every club and
+    # benchmarks.run has (user, club) pairs left to POST /memberships
+    clubs = max(discussions // 1000, 10)
+    return {
+        'users': users,
+        'clubs': clubs,
+        'books': max(discussions // 10, 10),
+        'memberships': min(users * 3, users * clubs),
+        'discussions': discussions,
+    }
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+
+def _chunked(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == SEED_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _memberships(rng, users, clubs, count):
+    # Every user joins a few distinct clubs until `count` memberships exist
+    per_user = max(count // users, 1)
+    made = 0
+    for user_id in range(1, users + 1):
+        for club_id in rng.sample(range(1, clubs + 1), min(per_user, clubs)):
+            if made == count:
+                return
+            yield {'user_id': user_id, 'club_id': club_id, 'role': 'admin' if made % 20 == 0 else 'member'}
+            made += 1
+
+
+def seed(counts, random_seed=0):
+    """Insert `counts` rows per table through the current app context's session."""
+    from flask import current_app
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from models import db, User, Club, Membership, Book, Discussion
+
+    rng = random.Random(random_seed)
+    # One hash shared by every user: hashing each would dominate seeding
+    password = generate_password_hash('password', current_app.config['PASSWORD_HASH_METHOD'])
+    tables = [
+        (User, ({'name': f'User {i}', 'email': f'user{i}@example.com', 'password': password}
+                for i in range(1, counts['users'] + 1))),
+        (Club, ({'name': f'Club {i}', 'description': _sentence(rng, 8)} for i in range(1, counts['clubs'] + 1))),
+        (Book, ({'title': _sentence(rng, 3).title(), 'author': f'Author {rng.randint(1, 5000)}',
+                 'genre': rng.choice(GENRES), 'user_id': rng.randint(1, counts['users'])}
+                for _ in range(counts['books']))),
+        (Membership, _memberships(rng, counts['users'], counts['clubs'], counts['memberships'])),
+        (Discussion, ({'content': _sentence(rng, 20),
+                       'date': datetime.date(2025, rng.randint(1, 12), rng.randint(1, 28)),
+                       'book_id': rng.randint(1, counts['books']), 'club_id': rng.randint(1, counts['clubs'])}
+                      for _ in range(counts['discussions']))),
+    ]
+    for model, rows in tables:
+        for chunk in _chunked(rows):
+            db.session.execute(insert(model), chunk)
+        db.session.commit()
+
+
+def create_database(path, counts, random_seed=0):
+    """Run the migrations on a new database at `path` and seed it."""
+    from flask_migrate import upgrade
+
+    app = load_app(path)
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, 'migrations'))
+        seed(counts, random_seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path')
+    parser.add_argument('--discussions', type=int, default=10000)
+    for table in ('users', 'clubs', 'books', 'memberships'):
+        parser.add_argument(f'--{table}', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = default_counts(args.discussions)
+    counts.update({table: getattr(args, table) for table in counts if getattr(args, table, None)})
+    if os.path.exists(args.path):
+        parser.error(f'{args.path} already exists')
+    create_database(args.path, counts, args.seed)
+    print(', '.join(f'{count} {table}' for table, count in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
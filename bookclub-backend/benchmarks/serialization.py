@@ -0,0 +1,68 @@
+"""Compare the old ORM + jsonify listing with the column-projected serializer.
+
+    python -m benchmarks.serialization --rows 100000 --repeat 5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.seed import create_database, default_counts, load_app
+
+
+def _best_of(repeat, fn, cleanup):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+        cleanup()
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000, help='discussions to seed')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bookclub.db')
+        create_database(path, default_counts(args.rows))
+        app = load_app(path)
+        from flask import jsonify
+        import serializers
+        from models import db, Discussion
+        from pagination import list_response
+
+        def orm_jsonify():
+            discussions = Discussion.query.all()
+            return jsonify([{
+                'id': discussion.id,
+                'content': discussion.content,
+                'date': discussion.date,
+                'book_id': discussion.book_id,
+                'club_id': discussion.club_id
+            } for discussion in discussions]).get_data()
+
+        def projected():
+            return list_response(Discussion).get_data()
+
+        cases = [('ORM objects + jsonify', orm_jsonify, None), ('projected rows + json', projected, False)]
+        if serializers.orjson is not None:
+            cases.append(('projected rows + orjson', projected, True))
+
+        baseline = None
+        orjson = serializers.orjson
+        for name, fn, use_orjson in cases:
+            serializers.orjson = orjson if use_orjson else None
+            with app.test_request_context('/discussions'):
+                # A fresh session each time, so the identity map starts empty
+                seconds = _best_of(args.repeat, fn, db.session.remove)
+            baseline = baseline or seconds
+            print(f'{name:<26} {seconds * 1000:>8.1f} ms  {baseline / seconds:>5.1f}x')
+        serializers.orjson = orjson
+
+
+if __name__ == '__main__':
+    main()
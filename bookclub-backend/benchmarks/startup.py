@@ -0,0 +1,81 @@
+"""Measure cold start: importing and creating the app, and its first request. Fail if over budget.
+
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --startup-budget 1000 --first-request-budget 50
+
+Each run is a fresh interpreter that does what a server worker does: import
+the app, call create_app() as wsgi.py does, then serve GET /clubs/1 through the
+test client. Exits non-zero if the median of either phase exceeds its budget
+in milliseconds.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.seed import create_database
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Default budgets in ms. The medians on a single-core reference machine are
+# about 2000 ms and 40 ms; the budgets leave 50% and 150% on top of them for
+# noise and slower machines, so they catch a startup that grows by half or a
+# first request that does work that belongs in create_app.
+STARTUP_BUDGET_MS = 3000
+FIRST_REQUEST_BUDGET_MS = 100
+
+RUN = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1], 'MIGRATIONS': False})
+created = time.perf_counter()
+status = app.test_client().get('/clubs/1').status_code
+first = time.perf_counter()
+print(json.dumps({'startup_ms': (created - start) * 1000, 'first_request_ms': (first - created) * 1000,
+                  'status': status}))
+'''
+
+
+def measure(path):
+    output = subprocess.run([sys.executable, '-c', RUN, f'sqlite:///{path}'], cwd=BACKEND, check=True,
+                            capture_output=True, text=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    if result.pop('status') != 200:
+        raise RuntimeError('GET /clubs/1 failed')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET_MS,
+                        help='ms to import and create the app')
+    parser.add_argument('--first-request-budget', type=float, default=FIRST_REQUEST_BUDGET_MS,
+                        help='ms for the first request')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bookclub.db')
+        create_database(path, {'users': 10, 'clubs': 2, 'books': 10, 'memberships': 10, 'discussions': 10})
+        # The first run also compiles bytecode; leave it out
+        measure(path)
+        runs = [measure(path) for _ in range(args.runs)]
+
+    over = []
+    print(f'{"phase":<16} {"median":>9} {"max":>9} {"budget":>9}')
+    for phase, budget in (('startup_ms', args.startup_budget), ('first_request_ms', args.first_request_budget)):
+        values = [run[phase] for run in runs]
+        median = statistics.median(values)
+        if median > budget:
+            over.append(phase)
+        print(f'{phase:<16} {median:>7.1f}ms {max(values):>7.1f}ms {budget:>7.0f}ms'
+              f'{"  OVER BUDGET" if median > budget else ""}')
+    if over:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import Date, Integer, String, insert, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+
+from cascade import delete_cascade
+from models import db, User, Club, Membership, Book, Discussion
+from serializers import parse_date
+
+# Rows per INSERT/UPDATE/DELETE statement, and per IN (...) lookup during validation
+BULK_CHUNK_SIZE = 500
+BULK_MAX_ROWS = 50000
+
+# fields: columns a row may set; required: columns a new row must set;
+# unique: columns that must not collide with each other or the table;
+# references: foreign key column -> model it points at
+BulkSpec = namedtuple('BulkSpec', 'model, fields, required, unique, references')
+
+BULK_SPECS = {
+    'users': BulkSpec(User, ('name', 'email', 'password'), ('name', 'email', 'password'), ('email',), {}),
+    'books': BulkSpec(Book, ('title', 'author', 'genre', 'user_id'), ('title', 'author', 'genre', 'user_id'), (),
+                      {'user_id': User}),
+    'memberships': BulkSpec(Membership, ('user_id', 'club_id', 'role'), ('user_id', 'club_id', 'role'), (),
+                            {'user_id': User, 'club_id': Club}),
+    'discussions': BulkSpec(Discussion, ('content', 'date', 'book_id', 'club_id'),
+                            ('content', 'date', 'book_id', 'club_id'), (), {'book_id': Book, 'club_id': Club}),
+}
+
+
+def _chunks(items, size=BULK_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _key_columns(model):
+    return model.__table__.primary_key.columns.values()
+
+
+def _key(model, row):
+    return tuple(row.get(column.key) for column in _key_columns(model))
+
+
+def _existing(column, values):
+    """Return the subset of `values` present in `column`, one IN (...) query per chunk."""
+    found = set()
+    for chunk in _chunks(list(values)):
+        found.update(db.session.execute(select(column).where(column.in_(chunk))).scalars())
+    return found
+
+
+def _existing_keys(model, keys):
+    columns = _key_columns(model)
+    if len(columns) == 1:
+        return {(value,) for value in _existing(columns[0], (key[0] for key in keys))}
+    found = set()
+    for chunk in _chunks(list(keys)):
+        found.update(tuple(row) for row in db.session.execute(select(*columns).where(tuple_(*columns).in_(chunk))))
+    return found
+
+
+class BulkResult:
+    def __init__(self):
+        self.done = []
+        self.errors = {}
+
+    def fail(self, index, message):
+        self.errors.setdefault(index, []).append(message)
+
+    def to_dict(self, verb):
+        return {verb: self.done, 'errors': [{'index': index, 'errors': messages}
+                                            for index, messages in sorted(self.errors.items())]}
+
+
+def _coerce_values(model, values, row, index, result):
+    """Convert integer columns given as strings, so lookups compare like with like, parse dates and check strings."""
+    for column in _key_columns(model):
+        if column.key in row:
+            values[column.key] = row[column.key]
+    for name, value in values.items():
+        column_type = model.__table__.c[name].type
+        if isinstance(column_type, Integer) and not isinstance(value, int):
+            try:
+                values[name] = int(value)
+            except (TypeError, ValueError):
+                result.fail(index, f'{name} must be an integer')
+                return False
+        elif isinstance(column_type, Date):
+            values[name] = parse_date(value)
+            if values[name] is None:
+                result.fail(index, f'{name} must be a date (YYYY-MM-DD)')
+                return False
+        elif isinstance(column_type, String) and value is not None and not isinstance(value, str):
+            # The driver would reject a list or an object and fail the whole batch; None is
+            # reported as missing, or by the NOT NULL constraint on update
+            result.fail(index, f'{name} must be a string')
+            return False
+    return True
+
+
+def _validate(spec, rows, result, creating):
+    """Check every row up front; return [(index, values)] for the rows that passed."""
+    valid = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            result.fail(index, 'Row must be an object')
+            continue
+        values = {field: row[field] for field in spec.fields if field in row}
+        if not _coerce_values(spec.model, values, row, index, result):
+            continue
+        if creating:
+            missing = [field for field in spec.required if not values.get(field)]
+            if missing:
+                result.fail(index, 'Missing required fields: ' + ', '.join(missing))
+                continue
+        else:
+            if None in _key(spec.model, values):
+                result.fail(index, 'Missing primary key')
+                continue
+        valid.append((index, values))
+
+    if not creating:
+        keys = _existing_keys(spec.model, {_key(spec.model, values) for _, values in valid})
+        for index, values in valid:
+            if _key(spec.model, values) not in keys:
+                result.fail(index, 'Row not found')
+    elif len(_key_columns(spec.model)) > 1:
+        # Composite keys are supplied by the client, so they can collide
+        seen = set()
+        keys = _existing_keys(spec.model, {_key(spec.model, values) for _, values in valid})
+        for index, values in valid:
+            key = _key(spec.model, values)
+            if key in keys or key in seen:
+                result.fail(index, 'Row already exists')
+            seen.add(key)
+
+    for field in spec.unique:
+        column = getattr(spec.model, field)
+        # value -> key of the row holding it, so an update may keep its own value
+        taken = {}
+        for chunk in _chunks(list({values[field] for _, values in valid if field in values})):
+            for value, *key in db.session.execute(
+                    select(column, *_key_columns(spec.model)).where(column.in_(chunk))):
+                taken[value] = tuple(key)
+        seen = set()
+        for index, values in valid:
+            if field in values:
+                value = values[field]
+                owner = taken.get(value)
+                if value in seen or (owner is not None and (creating or owner != _key(spec.model, values))):
+                    result.fail(index, f'Duplicate {field}: {value}')
+                seen.add(value)
+
+    for field, target in spec.references.items():
+        present = _existing(target.id, {values[field] for _, values in valid if field in values})
+        for index, values in valid:
+            if field in values and values[field] not in present:
+                result.fail(index, f'{target.__name__} {values[field]} not found')
+
+    return [(index, values) for index, values in valid if index not in result.errors]
+
+
+def _execute_chunk(statement, chunk, result, returning=()):
+    """Run one executemany chunk in a savepoint, falling back to row by row if it hits a constraint.
+
+    Returns (index, RETURNING row or None) for every row that was written. SQLite
+    returns the rows of a multi-row INSERT in no particular order, so when
+    `returning` names columns they are used to match rows back to their input.
+    """
+    try:
+        with db.session.begin_nested():
+            rows = db.session.execute(statement, [values for _, values in chunk])
+            if not returning:
+                return [(index, None) for index, _ in chunk]
+            return _match_returned(chunk, rows.all(), returning)
+    except IntegrityError:
+        pass
+
+    written = []
+    for index, values in chunk:
+        try:
+            with db.session.begin_nested():
+                rows = db.session.execute(statement, [values])
+                written.append((index, rows.first() if returning else None))
+        except IntegrityError as e:
+            result.fail(index, str(e.orig))
+    return written
+
+
+def _match_returned(chunk, rows, fields):
+    # Identical input rows are interchangeable, so any pairing among them is correct
+    def signature(values):
+        return tuple(str(values.get(field)) for field in fields)
+
+    pending = {}
+    for index, values in chunk:
+        pending.setdefault(signature(values), []).append(index)
+    return sorted((pending[signature(row._mapping)].pop(), row) for row in rows)
+
+
+def _hash_passwords(valid):
+    """Replace every password in `valid` with its hash, hashing in parallel on the app's pool."""
+    rows = [values for _, values in valid if values.get('password')]
+    if rows:
+        # Validation took the write lock; don't hold it while hashing. The
+        # constraints still catch rows that another request made invalid meanwhile.
+        db.session.rollback()
+    hashes = current_app.extensions['password_hasher'].hash_many([values['password'] for values in rows])
+    for values, password_hash in zip(rows, hashes):
+        values['password'] = password_hash
+    return valid
+
+
+def bulk_create(spec, rows):
+    result = BulkResult()
+    key_columns = _key_columns(spec.model)
+    # Multi-row INSERT ... VALUES (...), (...) RETURNING, one statement per chunk
+    statement = insert(spec.model).returning(*key_columns, *(getattr(spec.model, field) for field in spec.fields))
+    for chunk in _chunks(_hash_passwords(_validate(spec, rows, result, creating=True))):
+        for index, row in _execute_chunk(statement, chunk, result, returning=spec.fields):
+            result.done.append({'index': index, **{column.key: row._mapping[column.key] for column in key_columns}})
+    db.session.commit()
+    return result
+
+
+def bulk_update(spec, rows):
+    result = BulkResult()
+    key_names = [column.key for column in _key_columns(spec.model)]
+    for chunk in _chunks(_hash_passwords(_validate(spec, rows, result, creating=False))):
+        # ORM bulk UPDATE by primary key: one executemany per chunk
+        written = {index for index, _ in _execute_chunk(update(spec.model), chunk, result)}
+        result.done.extend({'index': index, **{name: values[name] for name in key_names}}
+                           for index, values in chunk if index in written)
+    db.session.commit()
+    return result
+
+
+def bulk_delete(spec, rows):
+    result = BulkResult()
+    key_columns = _key_columns(spec.model)
+    valid = []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            # Single-column keys may be given as bare ids
+            row = {key_columns[0].key: row} if len(key_columns) == 1 else {}
+        values = {}
+        if not _coerce_values(spec.model, values, row, index, result):
+            continue
+        key = _key(spec.model, values)
+        if None in key:
+            result.fail(index, 'Missing primary key')
+        else:
+            valid.append((index, key))
+    existing = _existing_keys(spec.model, {key for _, key in valid})
+    for index, key in valid:
+        if key not in existing:
+            result.fail(index, 'Row not found')
+    valid = [(index, key) for index, key in valid if index not in result.errors]
+
+    for chunk in _chunks(valid):
+        if len(key_columns) == 1:
+            condition = key_columns[0].in_([key[0] for _, key in chunk])
+        else:
+            condition = tuple_(*key_columns).in_([key for _, key in chunk])
+        delete_cascade(spec.model, condition)
+        result.done.extend({'index': index, **dict(zip((column.key for column in key_columns), key))}
+                           for index, key in chunk)
+    db.session.commit()
+    return result
@@ -0,0 +1,128 @@
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import select
+
+from models import db, TableVersion
+
+CacheEntry = namedtuple('CacheEntry', 'versions, body, etag, mimetype')
+
+
+class ResponseCache:
+    """LRU cache of GET response bodies, invalidated by per-table version counters.
+
+    The counters are the table_version rows, which database triggers bump on
+    every insert, update or delete, whichever worker or write path made it. A
+    request reads the counters of its tables in one query, in the transaction
+    it reads the data in, and a cached response is only served while they are
+    unchanged. Responses carry an ETag (a hash of the body), so a client that
+    sends it back in If-None-Match gets a 304 while the data is unchanged.
+    """
+
+    def __init__(self, app=None):
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = self.misses = self.not_modified = self.evictions = 0
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RESPONSE_CACHE_MAX_BYTES', 32 * 1024 * 1024)
+        app.extensions['response_cache'] = self
+
+    def cached(self, *tables):
+        """Cache the GET responses of a view whose output depends on `tables`."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                return self.respond(tables, view, args, kwargs)
+            return wrapper
+        return decorator
+
+    def respond(self, tables, view, args, kwargs):
+        """Answer the current request from the cache, or run `view` and cache its response."""
+        # A cache of size 0 is off: skip the version query too
+        if request.method != 'GET' or not current_app.config['RESPONSE_CACHE_MAX_BYTES']:
+            return view(*args, **kwargs)
+
+        key = request.full_path
+        versions = table_versions(tables)
+        entry = self._get(key, versions)
+        if entry is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+            entry = CacheEntry(versions, body, etag, response.mimetype)
+            self._put(key, entry)
+
+        response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+        response.set_etag(entry.etag)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            with self.lock:
+                self.not_modified += 1
+        return response
+
+    def _get(self, key, versions):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry.versions != versions:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def _put(self, key, entry):
+        max_bytes = current_app.config['RESPONSE_CACHE_MAX_BYTES']
+        if len(entry.body) > max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+                self.evictions += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'bytes': self.size,
+                'max_bytes': current_app.config['RESPONSE_CACHE_MAX_BYTES'],
+                'hits': self.hits,
+                'misses': self.misses,
+                'not_modified': self.not_modified,
+                'evictions': self.evictions,
+            }
+
+
+def table_versions(tables):
+    """The write counters of `tables`, in order, read in the current transaction."""
+    rows = db.session.execute(select(TableVersion.name, TableVersion.version)
+                              .where(TableVersion.name.in_(tables)))
+    versions = dict(rows.all())
+    return tuple(versions.get(table, 0) for table in tables)
+
+
+def cached(*tables):
+    """ResponseCache.cached for views defined before the app exists, e.g. in blueprints.
+
+    Uses the cache of the app serving the request.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            return current_app.extensions['response_cache'].respond(tables, view, args, kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+import os
+
+from flask import has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Engine profiles, selected with the BOOKCLUB_DB_PROFILE environment variable.
+# pragmas are applied to every new SQLite connection; engine_options are passed
+# to create_engine; readonly routes the reads of GET requests to a second,
+# read-only engine.
+ENGINE_PROFILES = {
+    'default': {
+        'pragmas': {},
+        'engine_options': {},
+        'readonly': False,
+    },
+    'production': {
+        'pragmas': {
+            # Readers no longer block the writer, and vice versa
+            'journal_mode': 'WAL',
+            # Safe with WAL: only a power loss can drop the last commits
+            'synchronous': 'NORMAL',
+            # Wait for the write lock instead of failing with "database is locked"
+            'busy_timeout': 10000,
+            # Negative values are KiB: 64 MiB of page cache per connection
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
+        'engine_options': {
+            'pool_size': 10,
+            'max_overflow': 10,
+            'pool_timeout': 10,
+            'connect_args': {'timeout': 10},
+        },
+        'readonly': True,
+    },
+}
+
+
+def apply_engine_profile(app, name=None):
+    """Copy the engine profile `name` (default: $BOOKCLUB_DB_PROFILE) into the app config.
+
+    Must run before db.init_app(app), which creates the engines.
+    """
+    name = name or os.environ.get('BOOKCLUB_DB_PROFILE', 'default')
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f'Unknown engine profile {name!r}, expected one of {", ".join(ENGINE_PROFILES)}')
+    profile = ENGINE_PROFILES[name]
+
+    app.config['SQLITE_PRAGMAS'] = dict(profile['pragmas'])
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', dict(profile['engine_options']))
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    if profile['readonly'] and url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:'):
+        readonly_url = url.set(database=f'file:{url.database}', query={'mode': 'ro', 'uri': 'true'})
+        app.config.setdefault('SQLALCHEMY_BINDS', {})['readonly'] = readonly_url.render_as_string(hide_password=False)
+
+
+def configure_engine(engine, pragmas=None, readonly=False):
+    """Install the connection hooks the app relies on on a SQLite engine."""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = dict(pragmas or {})
+    if readonly:
+        # journal_mode is a property of the database file, set by the writer
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'ON'
+
+    # pysqlite only opens a transaction before the first INSERT/UPDATE/DELETE,
+    # so a SAVEPOINT issued earlier becomes a transaction of its own and commits
+    # on release. Take transaction control away from the driver and let
+    # SQLAlchemy emit BEGIN, which makes savepoints nest inside one transaction.
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        # SQLite leaves foreign keys unenforced, and ON DELETE CASCADE inert, unless asked
+        dbapi_connection.execute('PRAGMA foreign_keys=ON')
+        for name, value in pragmas.items():
+            dbapi_connection.execute(f'PRAGMA {name}={value}')
+
+    @event.listens_for(engine, 'begin')
+    def on_begin(connection):
+        # A deferred transaction that reads and then writes cannot wait for
+        # the lock in WAL mode; write requests take it up front instead.
+        if not readonly and has_request_context() and request.method not in READ_METHODS:
+            connection.exec_driver_sql('BEGIN IMMEDIATE')
+        else:
+            connection.exec_driver_sql('BEGIN')
+
+
+def configure_engines(app, db):
+    """Run configure_engine on every engine of `db`; call inside an app context."""
+    for key, engine in db.engines.items():
+        configure_engine(engine, app.config.get('SQLITE_PRAGMAS'), readonly=key == 'readonly')
+
+
+class RoutingSession(Session):
+    """Session that sends the reads of GET requests to the 'readonly' bind when it is configured."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and request.method in READ_METHODS:
+            engine = self._db.engines.get('readonly')
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
@@ -0,0 +1,155 @@
+import queue
+import threading
+import time
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+
+from flask import Response, current_app, jsonify, stream_with_context
+from sqlalchemy import func, select
+
+from models import db, Discussion
+from serializers import dumps, serialize_rows
+
+# kind is 'created', 'updated' or 'deleted'; only creations carry an id,
+# the discussion id, which clients send back as Last-Event-ID to resume.
+# Updates and deletions made while a client was disconnected are not replayed.
+Event = namedtuple('Event', 'kind, data, id')
+
+# Events a subscriber may fall behind by before new ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Discussions replayed per query when a client resumes
+REPLAY_BATCH_SIZE = 500
+# How long EventSource waits before reconnecting after the stream drops
+RECONNECT_MS = 3000
+
+
+class EventBus:
+    """In-process publish/subscribe of discussion changes, one channel per club.
+
+    The discussion routes publish after they commit and every open
+    /clubs/<id>/discussions/stream response subscribes to its club. Changes
+    made by other worker processes, or by the bulk endpoints, never reach this
+    bus; the streams pick up those creations from the database on each
+    heartbeat instead.
+
+    Each open stream holds a worker thread. SSE_MAX_STREAMS bounds how many a
+    process serves at once; gunicorn.conf.py lowers it to the threads a gthread
+    worker can spare beside its other requests. Under gevent
+    (`gunicorn -k gevent`) the queues and locks used here are monkey-patched
+    into greenlet primitives, so an idle stream costs a greenlet rather than a
+    thread. gunicorn.conf.py does not preload the app for gevent workers, so
+    they are created after the patching.
+    """
+
+    def __init__(self, app=None):
+        self.subscribers = defaultdict(set)
+        self.streams = 0
+        self.lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SSE_HEARTBEAT_SECONDS', 15.0)
+        app.config.setdefault('SSE_MAX_STREAMS', 100)
+        app.extensions['event_bus'] = self
+
+    def publish(self, club_id, kind, data, id=None):
+        with self.lock:
+            subscribers = list(self.subscribers.get(club_id, ()))
+        for events in subscribers:
+            try:
+                events.put_nowait(Event(kind, data, id))
+            except queue.Full:
+                # A stalled client misses this event; creations are replayed from the database
+                pass
+
+    @contextmanager
+    def subscribe(self, club_id):
+        events = queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[club_id].add(events)
+        try:
+            yield events
+        finally:
+            with self.lock:
+                self.subscribers[club_id].discard(events)
+                if not self.subscribers[club_id]:
+                    del self.subscribers[club_id]
+
+    def _release_stream(self):
+        with self.lock:
+            self.streams -= 1
+
+    def stream(self, club_id, last_event_id=None):
+        """Return a text/event-stream response of the discussion changes of a club.
+
+        With `last_event_id`, first replays the discussions created after it.
+        """
+        # Counted from the request, not from when the body starts, so a burst cannot overshoot
+        with self.lock:
+            if self.streams >= current_app.config['SSE_MAX_STREAMS']:
+                return jsonify({'message': 'Too many open streams, retry later'}), 503, {'Retry-After': '5'}
+            self.streams += 1
+        heartbeat = current_app.config['SSE_HEARTBEAT_SECONDS']
+        fields = Discussion.api_fields
+
+        def created_after(last_id):
+            # Discussions newer than last_id, in batches; ends the read transaction afterwards
+            while True:
+                rows = db.session.execute(
+                    select(*(getattr(Discussion, field) for field in fields))
+                    .where(Discussion.club_id == club_id, Discussion.id > last_id)
+                    .order_by(Discussion.id).limit(REPLAY_BATCH_SIZE)).all()
+                db.session.close()
+                for item in serialize_rows(rows, fields):
+                    yield Event('created', item, item['id'])
+                if len(rows) < REPLAY_BATCH_SIZE:
+                    return
+                last_id = rows[-1][0]
+
+        def generate():
+            with self.subscribe(club_id) as events:
+                # Subscribe before reading, so nothing created in between is missed
+                if last_event_id is None:
+                    last_id = db.session.execute(
+                        select(func.coalesce(func.max(Discussion.id), 0)).where(Discussion.club_id == club_id)
+                    ).scalar()
+                    db.session.close()
+                else:
+                    last_id = last_event_id
+                yield f'retry: {RECONNECT_MS}\n\n'.encode()
+                next_poll = time.monotonic()
+                while True:
+                    event = None
+                    remaining = next_poll - time.monotonic()
+                    if remaining > 0:
+                        try:
+                            event = events.get(timeout=remaining)
+                        except queue.Empty:
+                            pass
+                    if event is not None and event.kind != 'created':
+                        yield format_event(event)
+                        continue
+                    # Creations are always read back from the database, in id order: a
+                    # published one only triggers the read, so creations from other
+                    # workers with lower ids are never skipped
+                    for created in created_after(last_id):
+                        last_id = created.id
+                        yield format_event(created)
+                    if event is None:
+                        # Also keeps proxies from closing an idle connection
+                        yield b': keepalive\n\n'
+                        next_poll = time.monotonic() + heartbeat
+
+        response = Response(stream_with_context(generate()), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+        # The server closes the response when the client leaves, even if the body never started
+        response.call_on_close(self._release_stream)
+        return response
+
+
+def format_event(event):
+    lines = [f'event: {event.kind}'.encode(), b'data: ' + dumps(event.data)]
+    if event.id is not None:
+        lines.insert(0, f'id: {event.id}'.encode())
+    return b'\n'.join(lines) + b'\n\n'
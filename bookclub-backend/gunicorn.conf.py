@@ -0,0 +1,49 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden on the command line or with GUNICORN_CMD_ARGS.
+"""
+import multiprocessing
+import os
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threads per worker: a worker keeps serving while requests wait on SQLite locks,
+# password hashes or open event streams. With gevent (pip install gevent,
+# GUNICORN_WORKER_CLASS=gevent) each request is a greenlet instead, and idle
+# event streams cost next to nothing.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+# Threads of a gthread worker that event streams may not take, so open streams
+# can never starve it of threads for other requests
+STREAM_RESERVED_THREADS = int(os.environ.get('GUNICORN_STREAM_RESERVED_THREADS', max(threads // 2, 1)))
+
+# Import the app once in the master, so workers fork with it loaded instead of
+# each paying the import time, and share its memory pages until they write.
+# Not for gevent: its worker monkey-patches threading, queue and socket after
+# the fork, and the locks and queues of an app imported before that would stay
+# real threading primitives that block the whole worker.
+preload_app = 'gevent' not in worker_class
+
+
+def post_fork(server, worker):
+    # SQLite connections must not cross a fork. Drop any the master opened
+    # without closing them, which would disturb the master's own use of them;
+    # each worker opens fresh ones on first use. The hashing pool and the
+    # background threads are only started on first use, so none exist yet.
+    # Without preload the worker has not imported the app yet, and must not
+    # before gevent patches it.
+    if not server.cfg.preload_app:
+        return
+    from models import db
+
+    with server.app.wsgi().app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    if worker.cfg.worker_class_str == 'gthread':
+        # Each open event stream holds one of the worker's threads until its client leaves
+        streams = max(worker.cfg.threads - STREAM_RESERVED_THREADS, 0)
+        worker.wsgi.config['SSE_MAX_STREAMS'] = min(worker.wsgi.config['SSE_MAX_STREAMS'], streams)
@@ -0,0 +1,142 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from models import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 500, 1000)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class Histogram:
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count], sum
+        self.counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self.sums = defaultdict(float)
+
+    def observe(self, labels, value):
+        # Buckets are stored non-cumulative and summed when rendered
+        self.counts[labels][bisect_left(self.buckets, value)] += 1
+        self.sums[labels] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for labels, counts in sorted(self.counts.items()):
+            label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{label_text}}} {self.sums[labels]}')
+            lines.append(f'{self.name}_count{{{label_text}}} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """Per-endpoint request latency, SQL statement count, DB time and response size.
+
+    Statements are counted with cursor events on every engine and attributed to
+    the request that ran them. The numbers are kept per worker process and
+    served in the Prometheus text format by the /metrics route. Requests slower
+    than SLOW_REQUEST_MS are logged as warnings.
+
+    Bodies of streamed responses are sent after the request is recorded, so
+    their size, and any queries they run, are not included.
+    """
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.histograms = {
+            'latency': Histogram('bookclub_request_duration_seconds', 'Time spent handling the request.',
+                                 LATENCY_BUCKETS),
+            'statements': Histogram('bookclub_request_sql_statements', 'SQL statements run by the request.',
+                                    STATEMENT_BUCKETS),
+            'db_time': Histogram('bookclub_request_db_seconds', 'Time the request spent waiting on SQL statements.',
+                                 LATENCY_BUCKETS),
+            'size': Histogram('bookclub_response_size_bytes', 'Size of the response body.', SIZE_BUCKETS),
+        }
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Register the request hooks; call after db.init_app(app)."""
+        app.config.setdefault('SLOW_REQUEST_MS', 500)
+        app.extensions['metrics'] = self
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+                event.listen(engine, 'handle_error', self._handle_error)
+
+    @staticmethod
+    def _before_request():
+        g.request_started = time.perf_counter()
+        g.sql_statements = 0
+        g.sql_seconds = 0.0
+
+    @staticmethod
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @staticmethod
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_started'].pop()
+        if has_request_context() and 'sql_statements' in g:
+            g.sql_statements += 1
+            g.sql_seconds += elapsed
+
+    @staticmethod
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute
+        if context.connection is not None and context.connection.info.get('query_started'):
+            context.connection.info['query_started'].pop()
+
+    def _after_request(self, response):
+        if 'request_started' not in g:
+            return response
+        elapsed = time.perf_counter() - g.request_started
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        labels = (('endpoint', endpoint), ('method', request.method))
+        size = response.content_length or 0
+
+        with self.lock:
+            self.requests[labels + (('status', str(response.status_code)),)] += 1
+            self.histograms['latency'].observe(labels, elapsed)
+            self.histograms['statements'].observe(labels, g.sql_statements)
+            self.histograms['db_time'].observe(labels, g.sql_seconds)
+            self.histograms['size'].observe(labels, size)
+
+        if elapsed * 1000 >= current_app.config['SLOW_REQUEST_MS']:
+            current_app.logger.warning('Slow request: %s %s took %.0f ms (%d SQL statements, %.0f ms in the database,'
+                                       ' %d bytes)', request.method, request.full_path.rstrip('?'), elapsed * 1000,
+                                       g.sql_statements, g.sql_seconds * 1000, size)
+        return response
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        with self.lock:
+            lines = ['# HELP bookclub_requests_total Requests handled.', '# TYPE bookclub_requests_total counter']
+            for labels, count in sorted(self.requests.items()):
+                label_text = ','.join(f'{key}="{value}"' for key, value in labels)
+                lines.append(f'bookclub_requests_total{{{label_text}}} {count}')
+            for histogram in self.histograms.values():
+                lines += histogram.render()
+
+        cache = current_app.extensions.get('response_cache')
+        if cache is not None:
+            for name, value in cache.stats().items():
+                kind = 'counter' if name in ('hits', 'misses', 'not_modified', 'evictions') else 'gauge'
+                metric = f'bookclub_response_cache_{name}' + ('_total' if kind == 'counter' else '')
+                lines += [f'# TYPE {metric} {kind}', f'{metric} {value}']
+        return '\n'.join(lines) + '\n'
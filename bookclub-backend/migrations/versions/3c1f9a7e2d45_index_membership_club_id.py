@@ -0,0 +1,26 @@
+"""Index membership.club_id
+
+Revision ID: 3c1f9a7e2d45
+Revises: b5a6de3856fd
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c1f9a7e2d45'
+down_revision = 'b5a6de3856fd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('membership', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_membership_club_id'), ['club_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('membership', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_membership_club_id'))
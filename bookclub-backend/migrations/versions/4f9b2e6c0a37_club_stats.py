@@ -0,0 +1,111 @@
+"""Club stats counters maintained by triggers
+
+Revision ID: 4f9b2e6c0a37
+Revises: e7a2c5d81b94
+Create Date: 2026-10-18 17:05:12.630941
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f9b2e6c0a37'
+down_revision = 'e7a2c5d81b94'
+branch_labels = None
+depends_on = None
+
+
+# The counters change in the statement that changes the rows, so they commit
+# or roll back with it. A later migration that rebuilds club, membership or
+# discussion must re-create the triggers on that table.
+TRIGGERS = [
+    """CREATE TRIGGER club_stats_ai AFTER INSERT ON club BEGIN
+        INSERT INTO club_stats(club_id) VALUES (new.id);
+    END""",
+    """CREATE TRIGGER club_stats_ad AFTER DELETE ON club BEGIN
+        DELETE FROM club_stats WHERE club_id = old.id;
+    END""",
+    """CREATE TRIGGER membership_stats_ai AFTER INSERT ON membership BEGIN
+        UPDATE club_stats SET member_count = member_count + 1 WHERE club_id = new.club_id;
+    END""",
+    """CREATE TRIGGER membership_stats_ad AFTER DELETE ON membership BEGIN
+        UPDATE club_stats SET member_count = member_count - 1 WHERE club_id = old.club_id;
+    END""",
+    """CREATE TRIGGER membership_stats_au AFTER UPDATE OF club_id ON membership BEGIN
+        UPDATE club_stats SET member_count = member_count - 1 WHERE club_id = old.club_id;
+        UPDATE club_stats SET member_count = member_count + 1 WHERE club_id = new.club_id;
+    END""",
+    # A book counts towards a club while at least one of its discussions does;
+    # club_book holds that reference count.
+    """CREATE TRIGGER discussion_stats_ai AFTER INSERT ON discussion BEGIN
+        INSERT INTO club_book(club_id, book_id, discussion_count) VALUES (new.club_id, new.book_id, 1)
+            ON CONFLICT(club_id, book_id) DO UPDATE SET discussion_count = discussion_count + 1;
+        UPDATE club_stats SET discussion_count = discussion_count + 1,
+            book_count = book_count + (SELECT discussion_count = 1 FROM club_book
+                                       WHERE club_id = new.club_id AND book_id = new.book_id)
+            WHERE club_id = new.club_id;
+    END""",
+    """CREATE TRIGGER discussion_stats_ad AFTER DELETE ON discussion BEGIN
+        UPDATE club_book SET discussion_count = discussion_count - 1
+            WHERE club_id = old.club_id AND book_id = old.book_id;
+        UPDATE club_stats SET discussion_count = discussion_count - 1,
+            book_count = book_count - (SELECT discussion_count = 0 FROM club_book
+                                       WHERE club_id = old.club_id AND book_id = old.book_id)
+            WHERE club_id = old.club_id;
+        DELETE FROM club_book WHERE club_id = old.club_id AND book_id = old.book_id AND discussion_count = 0;
+    END""",
+    """CREATE TRIGGER discussion_stats_au AFTER UPDATE OF club_id, book_id ON discussion BEGIN
+        UPDATE club_book SET discussion_count = discussion_count - 1
+            WHERE club_id = old.club_id AND book_id = old.book_id;
+        UPDATE club_stats SET discussion_count = discussion_count - 1,
+            book_count = book_count - (SELECT discussion_count = 0 FROM club_book
+                                       WHERE club_id = old.club_id AND book_id = old.book_id)
+            WHERE club_id = old.club_id;
+        DELETE FROM club_book WHERE club_id = old.club_id AND book_id = old.book_id AND discussion_count = 0;
+        INSERT INTO club_book(club_id, book_id, discussion_count) VALUES (new.club_id, new.book_id, 1)
+            ON CONFLICT(club_id, book_id) DO UPDATE SET discussion_count = discussion_count + 1;
+        UPDATE club_stats SET discussion_count = discussion_count + 1,
+            book_count = book_count + (SELECT discussion_count = 1 FROM club_book
+                                       WHERE club_id = new.club_id AND book_id = new.book_id)
+            WHERE club_id = new.club_id;
+    END""",
+]
+
+TRIGGER_NAMES = ('club_stats_ai', 'club_stats_ad', 'membership_stats_ai', 'membership_stats_ad',
+                 'membership_stats_au', 'discussion_stats_ai', 'discussion_stats_ad', 'discussion_stats_au')
+
+
+def upgrade():
+    op.create_table('club_stats',
+    sa.Column('club_id', sa.Integer(), nullable=False),
+    sa.Column('member_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('discussion_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('book_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('club_id')
+    )
+    op.create_table('club_book',
+    sa.Column('club_id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('discussion_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('club_id', 'book_id')
+    )
+
+    # Count the rows that already exist, then keep counting
+    op.execute('INSERT INTO club_book(club_id, book_id, discussion_count) '
+               'SELECT club_id, book_id, count(*) FROM discussion GROUP BY club_id, book_id')
+    op.execute("""INSERT INTO club_stats(club_id, member_count, discussion_count, book_count)
+        SELECT club.id,
+            (SELECT count(*) FROM membership WHERE membership.club_id = club.id),
+            (SELECT coalesce(sum(discussion_count), 0) FROM club_book WHERE club_book.club_id = club.id),
+            (SELECT count(*) FROM club_book WHERE club_book.club_id = club.id)
+        FROM club""")
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade():
+    for name in TRIGGER_NAMES:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_table('club_book')
+    op.drop_table('club_stats')
@@ -0,0 +1,63 @@
+"""Full-text search tables for books and discussions
+
+Revision ID: 5b7c0d9e8a12
+Revises: 8d2e4b6a1f03
+Create Date: 2026-10-18 11:26:05.310472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7c0d9e8a12'
+down_revision = '8d2e4b6a1f03'
+branch_labels = None
+depends_on = None
+
+
+# External-content FTS5 tables: the text lives in book/discussion, the index
+# is kept in step by triggers so writes from any code path are picked up.
+BOOK_TRIGGERS = [
+    """CREATE TRIGGER book_fts_ai AFTER INSERT ON book BEGIN
+        INSERT INTO book_fts(rowid, title, author, genre) VALUES (new.id, new.title, new.author, new.genre);
+    END""",
+    """CREATE TRIGGER book_fts_ad AFTER DELETE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, genre) VALUES ('delete', old.id, old.title, old.author, old.genre);
+    END""",
+    """CREATE TRIGGER book_fts_au AFTER UPDATE ON book BEGIN
+        INSERT INTO book_fts(book_fts, rowid, title, author, genre) VALUES ('delete', old.id, old.title, old.author, old.genre);
+        INSERT INTO book_fts(rowid, title, author, genre) VALUES (new.id, new.title, new.author, new.genre);
+    END""",
+]
+
+DISCUSSION_TRIGGERS = [
+    """CREATE TRIGGER discussion_fts_ai AFTER INSERT ON discussion BEGIN
+        INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER discussion_fts_ad AFTER DELETE ON discussion BEGIN
+        INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER discussion_fts_au AFTER UPDATE ON discussion BEGIN
+        INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+
+
+def upgrade():
+    op.execute("CREATE VIRTUAL TABLE book_fts USING fts5(title, author, genre, content='book', content_rowid='id')")
+    op.execute("CREATE VIRTUAL TABLE discussion_fts USING fts5(content, content='discussion', content_rowid='id')")
+    for statement in BOOK_TRIGGERS + DISCUSSION_TRIGGERS:
+        op.execute(statement)
+    # Index the rows that already exist
+    op.execute("INSERT INTO book_fts(book_fts) VALUES ('rebuild')")
+    op.execute("INSERT INTO discussion_fts(discussion_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    for name in ('book_fts_ai', 'book_fts_ad', 'book_fts_au',
+                 'discussion_fts_ai', 'discussion_fts_ad', 'discussion_fts_au'):
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.execute('DROP TABLE IF EXISTS discussion_fts')
+    op.execute('DROP TABLE IF EXISTS book_fts')
@@ -0,0 +1,34 @@
+"""Index book and discussion foreign keys
+
+Revision ID: 8d2e4b6a1f03
+Revises: 3c1f9a7e2d45
+Create Date: 2026-10-18 10:03:17.551920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e4b6a1f03'
+down_revision = '3c1f9a7e2d45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('book', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_book_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('discussion', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_discussion_book_id'), ['book_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_discussion_club_id'), ['club_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('discussion', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_discussion_club_id'))
+        batch_op.drop_index(batch_op.f('ix_discussion_book_id'))
+
+    with op.batch_alter_table('book', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_book_user_id'))
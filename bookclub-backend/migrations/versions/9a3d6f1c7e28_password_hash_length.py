@@ -0,0 +1,29 @@
+"""Room for password hashes in user.password
+
+Revision ID: 9a3d6f1c7e28
+Revises: 4f9b2e6c0a37
+Create Date: 2026-10-18 18:21:47.402316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3d6f1c7e28'
+down_revision = '4f9b2e6c0a37'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing plaintext passwords are hashed when their users next log in
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password', existing_type=sa.String(length=100), type_=sa.String(length=255),
+                              existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.alter_column('password', existing_type=sa.String(length=255), type_=sa.String(length=100),
+                              existing_nullable=False)
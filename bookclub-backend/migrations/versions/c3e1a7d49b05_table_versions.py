@@ -0,0 +1,47 @@
+"""Per-table write counters maintained by triggers
+
+Revision ID: c3e1a7d49b05
+Revises: 9a3d6f1c7e28
+Create Date: 2026-10-18 21:12:40.518307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e1a7d49b05'
+down_revision = '9a3d6f1c7e28'
+branch_labels = None
+depends_on = None
+
+
+# The tables whose writes invalidate cached responses. Their counters change in
+# the statement that writes, so every worker sees a write once it commits. A
+# later migration that rebuilds one of these tables must re-create its triggers.
+TABLES = ('user', 'club', 'book', 'membership', 'discussion')
+TRIGGERS = [
+    f"""CREATE TRIGGER {table}_version_{suffix} AFTER {operation} ON "{table}" BEGIN
+        UPDATE table_version SET version = version + 1 WHERE name = '{table}';
+    END"""
+    for table in TABLES
+    for operation, suffix in (('INSERT', 'ai'), ('UPDATE', 'au'), ('DELETE', 'ad'))
+]
+TRIGGER_NAMES = tuple(f'{table}_version_{suffix}' for table in TABLES for suffix in ('ai', 'au', 'ad'))
+
+
+def upgrade():
+    op.create_table('table_version',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(sa.table('table_version', sa.column('name')), [{'name': table} for table in TABLES])
+    for statement in TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade():
+    for name in TRIGGER_NAMES:
+        op.execute(f'DROP TRIGGER IF EXISTS {name}')
+    op.drop_table('table_version')
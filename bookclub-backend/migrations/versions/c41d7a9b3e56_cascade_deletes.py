@@ -0,0 +1,79 @@
+"""Cascade deletes along foreign keys
+
+Revision ID: c41d7a9b3e56
+Revises: 5b7c0d9e8a12
+Create Date: 2026-10-18 14:12:40.118304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7a9b3e56'
+down_revision = '5b7c0d9e8a12'
+branch_labels = None
+depends_on = None
+
+
+# The foreign keys were created unnamed; batch mode names the reflected ones
+# with this convention so they can be dropped and recreated.
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+FOREIGN_KEYS = [
+    ('book', 'user_id', 'user'),
+    ('membership', 'user_id', 'user'),
+    ('membership', 'club_id', 'club'),
+    ('discussion', 'book_id', 'book'),
+    ('discussion', 'club_id', 'club'),
+]
+
+# Rebuilding book and discussion drops their triggers; these are the
+# full-text search triggers of 5b7c0d9e8a12.
+FTS_TRIGGERS = {
+    'book': [
+        """CREATE TRIGGER book_fts_ai AFTER INSERT ON book BEGIN
+            INSERT INTO book_fts(rowid, title, author, genre) VALUES (new.id, new.title, new.author, new.genre);
+        END""",
+        """CREATE TRIGGER book_fts_ad AFTER DELETE ON book BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author, genre) VALUES ('delete', old.id, old.title, old.author, old.genre);
+        END""",
+        """CREATE TRIGGER book_fts_au AFTER UPDATE ON book BEGIN
+            INSERT INTO book_fts(book_fts, rowid, title, author, genre) VALUES ('delete', old.id, old.title, old.author, old.genre);
+            INSERT INTO book_fts(rowid, title, author, genre) VALUES (new.id, new.title, new.author, new.genre);
+        END""",
+    ],
+    'discussion': [
+        """CREATE TRIGGER discussion_fts_ai AFTER INSERT ON discussion BEGIN
+            INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+        """CREATE TRIGGER discussion_fts_ad AFTER DELETE ON discussion BEGIN
+            INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END""",
+        """CREATE TRIGGER discussion_fts_au AFTER UPDATE ON discussion BEGIN
+            INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+        END""",
+    ],
+}
+
+
+def _rebuild_foreign_keys(ondelete):
+    for table in ('book', 'membership', 'discussion'):
+        with op.batch_alter_table(table, schema=None, naming_convention=NAMING_CONVENTION) as batch_op:
+            for fk_table, column, referred in FOREIGN_KEYS:
+                if fk_table == table:
+                    name = NAMING_CONVENTION['fk'] % {'table_name': table, 'column_0_name': column,
+                                                      'referred_table_name': referred}
+                    batch_op.drop_constraint(name, type_='foreignkey')
+                    batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+        for statement in FTS_TRIGGERS.get(table, ()):
+            op.execute(statement)
+
+
+def upgrade():
+    _rebuild_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _rebuild_foreign_keys(None)
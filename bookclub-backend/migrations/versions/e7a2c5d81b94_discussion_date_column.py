@@ -0,0 +1,65 @@
+"""Store discussion dates as dates and index them per club
+
+Revision ID: e7a2c5d81b94
+Revises: c41d7a9b3e56
+Create Date: 2026-10-18 15:40:21.207619
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c5d81b94'
+down_revision = 'c41d7a9b3e56'
+branch_labels = None
+depends_on = None
+
+
+# Rebuilding discussion drops its triggers; these are the full-text search
+# triggers of 5b7c0d9e8a12.
+DISCUSSION_TRIGGERS = [
+    """CREATE TRIGGER discussion_fts_ai AFTER INSERT ON discussion BEGIN
+        INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER discussion_fts_ad AFTER DELETE ON discussion BEGIN
+        INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER discussion_fts_au AFTER UPDATE ON discussion BEGIN
+        INSERT INTO discussion_fts(discussion_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO discussion_fts(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+
+
+def upgrade():
+    connection = op.get_bind()
+    # date() accepts YYYY-MM-DD and ISO datetimes such as 2025-02-15T14:00:00Z
+    invalid = connection.exec_driver_sql(
+        'SELECT id, date FROM discussion WHERE date(date) IS NULL ORDER BY id LIMIT 20').all()
+    if invalid:
+        raise RuntimeError('Fix these discussion dates before upgrading: '
+                           + ', '.join(f'{id}: {date!r}' for id, date in invalid))
+    op.execute('UPDATE discussion SET date = date(date) WHERE date != date(date)')
+
+    # Reflect the column as a Date already: a VARCHAR to DATE change would make
+    # batch mode copy the rows with CAST(date AS DATE), which yields the year
+    with op.batch_alter_table('discussion', schema=None,
+                              reflect_args=[sa.Column('date', sa.Date(), nullable=False)]) as batch_op:
+        batch_op.alter_column('date', existing_type=sa.Date(), type_=sa.Date(), existing_nullable=False)
+        # The composite index also serves lookups by club_id alone
+        batch_op.drop_index('ix_discussion_club_id')
+        batch_op.create_index('ix_discussion_club_id_date', ['club_id', 'date'], unique=False)
+    for statement in DISCUSSION_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade():
+    with op.batch_alter_table('discussion', schema=None,
+                              reflect_args=[sa.Column('date', sa.String(length=10), nullable=False)]) as batch_op:
+        batch_op.drop_index('ix_discussion_club_id_date')
+        batch_op.create_index('ix_discussion_club_id', ['club_id'], unique=False)
+        batch_op.alter_column('date', existing_type=sa.String(length=10), type_=sa.String(length=10),
+                              existing_nullable=False)
+    for statement in DISCUSSION_TRIGGERS:
+        op.execute(statement)
@@ -1,30 +1,39 @@
 from flask_sqlalchemy import SQLAlchemy
 
+from engine import RoutingSession
+
 # Initialize the SQLAlchemy instance
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'user'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
-    books = db.relationship('Book', backref='user', lazy=True)
-    memberships = db.relationship('Membership', back_populates='user')
+    # A werkzeug.security hash, or plaintext until the user next logs in
+    password = db.Column(db.String(255), nullable=False)
+    # Columns exposed by the API, in response order
+    api_fields = ('id', 'name', 'email')
+    # Child rows are removed by ON DELETE CASCADE, never loaded just to be deleted
+    books = db.relationship('Book', backref='user', lazy=True, passive_deletes=True)
+    memberships = db.relationship('Membership', back_populates='user', passive_deletes=True)
 
 class Club(db.Model):
     __tablename__ = 'club'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255), nullable=False)
-    memberships = db.relationship('Membership', back_populates='club')
-    discussions = db.relationship('Discussion', backref='club', lazy=True)
+    api_fields = ('id', 'name', 'description')
+    memberships = db.relationship('Membership', back_populates='club', passive_deletes=True)
+    discussions = db.relationship('Discussion', backref='club', lazy=True, passive_deletes=True)
 
 class Membership(db.Model):
     __tablename__ = 'membership'
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
-    club_id = db.Column(db.Integer, db.ForeignKey('club.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    # user_id lookups use the primary key; club_id needs its own index
+    club_id = db.Column(db.Integer, db.ForeignKey('club.id', ondelete='CASCADE'), primary_key=True, index=True)
     role = db.Column(db.String(50), nullable=False)  # User-submittable attribute
+    api_fields = ('user_id', 'club_id', 'role')
     user = db.relationship('User', back_populates='memberships')
     club = db.relationship('Club', back_populates='memberships')
 
@@ -34,12 +43,43 @@ class Book(db.Model):
     title = db.Column(db.String(200), nullable=False)
     author = db.Column(db.String(100), nullable=False)
     genre = db.Column(db.String(50), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    api_fields = ('id', 'title', 'author', 'genre')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), nullable=False, index=True)
 
 class Discussion(db.Model):
     __tablename__ = 'discussion'
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    date = db.Column(db.String(10), nullable=False)
-    book_id = db.Column(db.Integer, db.ForeignKey('book.id'), nullable=False)
-    club_id = db.Column(db.Integer, db.ForeignKey('club.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    book_id = db.Column(db.Integer, db.ForeignKey('book.id', ondelete='CASCADE'), nullable=False, index=True)
+    club_id = db.Column(db.Integer, db.ForeignKey('club.id', ondelete='CASCADE'), nullable=False)
+    api_fields = ('id', 'content', 'date', 'book_id', 'club_id')
+    # A club's timeline is a range of this index; it also serves club_id lookups
+    __table_args__ = (db.Index('ix_discussion_club_id_date', 'club_id', 'date'),)
+
+# Counters kept up to date by database triggers (see the club stats
+# migration), so they follow every write path, bulk and cascades included.
+# They have no foreign keys: the triggers remove their rows themselves.
+class ClubStats(db.Model):
+    __tablename__ = 'club_stats'
+    club_id = db.Column(db.Integer, primary_key=True)
+    member_count = db.Column(db.Integer, nullable=False, server_default='0')
+    discussion_count = db.Column(db.Integer, nullable=False, server_default='0')
+    # Distinct books discussed in the club
+    book_count = db.Column(db.Integer, nullable=False, server_default='0')
+    api_fields = ('club_id', 'member_count', 'discussion_count', 'book_count')
+
+class ClubBook(db.Model):
+    # Discussions per (club, book), so book_count can be kept without a COUNT(DISTINCT)
+    __tablename__ = 'club_book'
+    club_id = db.Column(db.Integer, primary_key=True)
+    book_id = db.Column(db.Integer, primary_key=True)
+    discussion_count = db.Column(db.Integer, nullable=False)
+
+# Write counters per table, bumped by database triggers (see the table versions
+# migration) in the statement that writes. The response cache compares them to
+# tell whether any worker has changed a table since a response was cached.
+class TableVersion(db.Model):
+    __tablename__ = 'table_version'
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, server_default='0')
@@ -0,0 +1,104 @@
+from flask import Response, jsonify, request, stream_with_context
+from sqlalchemy import select, tuple_
+
+from models import db
+from serializers import dumps, invalid_fields_message, json_response, parse_date, requested_fields, serialize_rows
+
+# Page size used when ?after= is given without ?limit=
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip when streaming a whole table
+STREAM_BATCH_SIZE = 1000
+
+
+def list_response(model):
+    """Return a collection of `model` rows, paginated or streamed on request.
+
+    - no paging arguments: the whole table as a JSON array (the original behaviour)
+    - ?after=<id>&limit=N: a keyset page, `{"items": [...], "next_cursor": <id or null>}`
+    - ?stream=1: the whole table as a JSON array, written row by row
+    - ?fields=a,b: only these fields of each row
+
+    Only the requested columns are selected, as plain row tuples, so no ORM
+    objects are built.
+    """
+    fields = requested_fields(model)
+    if fields is None:
+        return jsonify(invalid_fields_message(model)), 400
+    # The id always comes first, as the cursor; it is dropped if not requested
+    query = select(model.id, *(getattr(model, field) for field in fields)).order_by(model.id)
+
+    if request.args.get('stream') in ('1', 'true'):
+        return stream_response(query, fields)
+
+    if 'after' not in request.args and 'limit' not in request.args:
+        return json_response(serialize_rows((row[1:] for row in db.session.execute(query)), fields))
+
+    after = request.args.get('after', type=int)
+    if 'after' in request.args and after is None:
+        return jsonify({'message': 'after must be an integer id'}), 400
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    if after is not None:
+        query = query.where(model.id > after)
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+    return json_response({'items': serialize_rows((row[1:] for row in rows[:limit]), fields),
+                          'next_cursor': next_cursor})
+
+
+def timeline_response(model, condition):
+    """Return a page of the `model` rows matching `condition`, in (date, id) order.
+
+    - ?from=YYYY-MM-DD&to=YYYY-MM-DD: only rows dated within this range, inclusive
+    - ?after=<date>,<id>&limit=N: the page after this cursor; `next_cursor` is
+      the cursor of the next page, or null on the last one
+    - ?fields=a,b: only these fields of each row
+
+    With an index on (<condition column>, date) each page is one range scan.
+    """
+    fields = requested_fields(model)
+    if fields is None:
+        return jsonify(invalid_fields_message(model)), 400
+    query = select(model.date, model.id, *(getattr(model, field) for field in fields)) \
+        .where(condition).order_by(model.date, model.id)
+
+    for name, compare in (('from', model.date.__ge__), ('to', model.date.__le__)):
+        if name in request.args:
+            value = parse_date(request.args[name])
+            if value is None:
+                return jsonify({'message': f'{name} must be a date (YYYY-MM-DD)'}), 400
+            query = query.where(compare(value))
+
+    if 'after' in request.args:
+        date, _, id = request.args['after'].partition(',')
+        date = parse_date(date)
+        if date is None or not id.isdigit():
+            return jsonify({'message': 'after must be a cursor of the form <date>,<id>'}), 400
+        query = query.where(tuple_(model.date, model.id) > tuple_(date, int(id)))
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'message': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    # Fetch one extra row to know whether another page exists
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    next_cursor = f'{rows[limit - 1][0].isoformat()},{rows[limit - 1][1]}' if len(rows) > limit else None
+    return json_response({'items': serialize_rows((row[2:] for row in rows[:limit]), fields),
+                          'next_cursor': next_cursor})
+
+
+def stream_response(query, fields):
+    """Stream `query` as a JSON array without loading every row at once."""
+    def generate():
+        result = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        yield b'['
+        for i, batch in enumerate(result.partitions()):
+            # Encode a whole batch at once and strip its brackets
+            yield (b',' if i else b'') + dumps(serialize_rows((row[1:] for row in batch), fields))[1:-1]
+        yield b']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
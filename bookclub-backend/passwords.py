@@ -0,0 +1,119 @@
+import hmac
+import os
+import re
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# What werkzeug.security produces: method$salt$hash
+HASH_PATTERN = re.compile(r'^(scrypt|pbkdf2):[^$]+\$[^$]+\$[0-9a-f]+$')
+
+
+class HashingBusy(Exception):
+    """Every hashing slot stayed taken for PASSWORD_HASH_WAIT_SECONDS."""
+
+
+def is_hashed(stored):
+    return bool(HASH_PATTERN.match(stored))
+
+
+class PasswordHasher:
+    """Hash and check passwords on a bounded pool, off the request's own budget.
+
+    A hash costs tens of milliseconds of CPU by design. Running them on a pool
+    of PASSWORD_HASH_WORKERS makes the concurrency explicit: at most that many
+    run at once, PASSWORD_HASH_QUEUE more may wait, and beyond that callers
+    wait up to PASSWORD_HASH_WAIT_SECONDS before HashingBusy is raised (a 503).
+    hashlib's scrypt and PBKDF2 release the GIL, so a thread pool hashes on
+    several cores; PASSWORD_HASH_POOL = 'process' uses processes instead.
+
+    PASSWORD_HASH_METHOD is a werkzeug.security method string with its cost
+    parameters, e.g. 'scrypt:32768:8:1' (N, r, p) or 'pbkdf2:sha256:600000'.
+    Hashes made with another method are upgraded on the next login, as are
+    the plaintext passwords stored before hashing was introduced.
+    """
+
+    def __init__(self, app=None):
+        self.executor = None
+        self.slots = None
+        self._dummy_hashes = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 1)
+        app.config.setdefault('PASSWORD_HASH_QUEUE', 4 * app.config['PASSWORD_HASH_WORKERS'])
+        app.config.setdefault('PASSWORD_HASH_WAIT_SECONDS', 2.0)
+        app.config.setdefault('PASSWORD_HASH_POOL', 'thread')
+        app.extensions['password_hasher'] = self
+
+        workers = app.config['PASSWORD_HASH_WORKERS']
+        pool = ProcessPoolExecutor if app.config['PASSWORD_HASH_POOL'] == 'process' else ThreadPoolExecutor
+        self.executor = pool(max_workers=workers)
+        self.slots = threading.BoundedSemaphore(workers + app.config['PASSWORD_HASH_QUEUE'])
+        self.config = app.config
+
+    def _run(self, fn, *args):
+        if not self.slots.acquire(timeout=self.config['PASSWORD_HASH_WAIT_SECONDS']):
+            raise HashingBusy()
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.config['PASSWORD_HASH_METHOD'])
+
+    def hash_many(self, passwords):
+        """Hash several passwords in parallel, each holding a slot while it runs."""
+        futures = []
+        try:
+            for password in passwords:
+                if not self.slots.acquire(timeout=self.config['PASSWORD_HASH_WAIT_SECONDS']):
+                    raise HashingBusy()
+                future = self.executor.submit(generate_password_hash, password, self.config['PASSWORD_HASH_METHOD'])
+                future.add_done_callback(lambda _: self.slots.release())
+                futures.append(future)
+            return [future.result() for future in futures]
+        except HashingBusy:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def hash_unusable(self, count):
+        """Hashes of `count` random secrets, for users who have no password yet (e.g. imported ones).
+
+        Nobody knows the secrets, so no login matches them. They are real hashes,
+        so they take as long to check as any other and cannot be mistaken for a
+        plaintext password from before hashing.
+        """
+        return self.hash_many([secrets.token_hex(32) for _ in range(count)])
+
+    def verify(self, stored, password):
+        """Return (matches, new hash to store or None).
+
+        A new hash is returned when the password matched but was stored in
+        plaintext or with another method than PASSWORD_HASH_METHOD.
+        """
+        if stored is None:
+            # Spend the same time as a real check, so these cannot be told apart
+            self._run(check_password_hash, self._dummy_hash(), password)
+            return False, None
+        if not is_hashed(stored):
+            if not hmac.compare_digest(stored.encode(), password.encode()):
+                return False, None
+            return True, self.hash(password)
+        if not self._run(check_password_hash, stored, password):
+            return False, None
+        if not stored.startswith(self.config['PASSWORD_HASH_METHOD'] + '$'):
+            return True, self.hash(password)
+        return True, None
+
+    def _dummy_hash(self):
+        method = self.config['PASSWORD_HASH_METHOD']
+        if method not in self._dummy_hashes:
+            self._dummy_hashes[method] = generate_password_hash(os.urandom(16).hex(), method)
+        return self._dummy_hashes[method]
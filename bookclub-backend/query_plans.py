@@ -0,0 +1,131 @@
+import datetime
+import os
+import tempfile
+
+import click
+from sqlalchemy import event, insert
+
+from models import db, User, Club, Membership, Book, Discussion
+
+
+# The requests every page view makes, keyed by a readable name. The SQL they
+# run must be served by indexes. Full-table listings (GET without ?after=) are
+# deliberately left out; they scan by definition.
+HOT_REQUESTS = {
+    'users page': ('GET', '/users?after=1&limit=100'),
+    'clubs page': ('GET', '/clubs?after=1&limit=100'),
+    'books page': ('GET', '/books?after=1&limit=100'),
+    'discussions page': ('GET', '/discussions?after=1&limit=100'),
+    'user by id': ('GET', '/users/1'),
+    'club by id': ('GET', '/clubs/1'),
+    'book by id': ('GET', '/books/1'),
+    'discussion by id': ('GET', '/discussions/1'),
+    'memberships of club': ('GET', '/memberships?club_id=1'),
+    'memberships of user': ('GET', '/memberships?user_id=1'),
+    'club timeline page': ('GET', '/clubs/1/discussions?from=2025-01-01&after=2025-01-01,1&limit=100'),
+    # Cascading deletes look rows up by their foreign keys
+    'delete user': ('DELETE', '/users/2'),
+    'delete book': ('DELETE', '/books/3'),
+    'delete club': ('DELETE', '/clubs/4'),
+}
+
+
+def seed(connection, rows=1000):
+    """Fill every table so the planner has statistics to work with.
+
+    Each parent row has about ten children, as in real data; with a handful of
+    parents the statistics make an index look no better than a scan.
+    """
+    parents = rows // 10
+    connection.execute(insert(User), [
+        {'id': i, 'name': f'user {i}', 'email': f'user{i}@example.com', 'password': 'x'} for i in range(1, rows + 1)])
+    connection.execute(insert(Club), [
+        {'id': i, 'name': f'club {i}', 'description': 'seeded'} for i in range(1, rows + 1)])
+    connection.execute(insert(Membership), [
+        {'user_id': i, 'club_id': i % parents + 1, 'role': 'member'} for i in range(1, rows + 1)])
+    connection.execute(insert(Book), [
+        {'id': i, 'title': f'book {i}', 'author': 'someone', 'genre': 'fiction', 'user_id': i % parents + 1}
+        for i in range(1, rows + 1)])
+    connection.execute(insert(Discussion), [
+        {'id': i, 'content': 'seeded', 'date': datetime.date(2025, 1, i % 28 + 1), 'book_id': i % parents + 1,
+         'club_id': i % parents + 1}
+        for i in range(1, rows + 1)])
+    connection.exec_driver_sql('ANALYZE')
+
+
+def explain(connection, statement, parameters=()):
+    """Return the detail column of EXPLAIN QUERY PLAN for an SQL string."""
+    return [row[-1] for row in connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)]
+
+
+def captured_statements(app):
+    """Run every hot request through `app` and return {name: [(sql, parameters)]} of what it ran."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+            captured.append((statement, parameters))
+
+    statements = {}
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        client = app.test_client()
+        for name, (method, url) in HOT_REQUESTS.items():
+            response = client.open(url, method=method)
+            if response.status_code != 200:
+                raise RuntimeError(f'{name}: {method} {url} returned {response.status_code}')
+            if not captured:
+                raise RuntimeError(f'{name}: {method} {url} ran no SQL')
+            statements[name], captured[:] = list(captured), []
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', capture)
+    return statements
+
+
+def scans():
+    """Serve the hot requests from a seeded copy of the schema and return {name: plans} for those that scan.
+
+    The statements are the ones the routes actually ran, captured from the
+    engine, so the check follows any change to their queries.
+    """
+    from app import create_app
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(directory, "plans.db")}',
+                          'BOOKCLUB_DB_PROFILE': 'default', 'MIGRATIONS': False,
+                          # Every request must reach the database
+                          'RESPONSE_CACHE_MAX_BYTES': 0})
+        with app.app_context():
+            with db.engine.begin() as connection:
+                db.metadata.create_all(connection)
+                seed(connection)
+        try:
+            failures = {}
+            for name, statements in captured_statements(app).items():
+                with app.app_context(), db.engine.connect() as connection:
+                    plans = [(sql, explain(connection, sql, parameters)) for sql, parameters in statements]
+                scanning = [f'{" ".join(sql.split())}: ' + '; '.join(plan)
+                            for sql, plan in plans if any(step.startswith('SCAN') for step in plan)]
+                if scanning:
+                    failures[name] = scanning
+        finally:
+            with app.app_context():
+                for engine in db.engines.values():
+                    engine.dispose()
+    return failures
+
+
+@click.command('check-query-plans')
+def check_query_plans():
+    """Fail if any hot request runs a query that falls back to a full table scan."""
+    failures = scans()
+    for name, plans in failures.items():
+        for plan in plans:
+            click.echo(f'{name}: {plan}', err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f'The queries of all {len(HOT_REQUESTS)} hot requests use an index.')
@@ -0,0 +1,187 @@
+import itertools
+import threading
+import time
+from collections import namedtuple
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Book, ClubBook, Membership
+from serializers import serialize_rows
+
+# candidates: clubs x books, the best books to recommend to the members of each
+# club, scored from the other clubs; club_books: clubs x books, nonzero where the
+# club discussed the book. Both are scipy CSR matrices indexed by id.
+Snapshot = namedtuple('Snapshot', 'candidates, club_books, built_at')
+
+# Books returned when ?limit= is not given, and at most
+DEFAULT_RECOMMENDATIONS = 10
+MAX_RECOMMENDATIONS = 100
+# Books kept per club; a user's recommendations are drawn from those of their clubs
+CANDIDATES_PER_CLUB = 200
+# Scores computed at once while building: bounds the dense block to 32 MB
+BUILD_BLOCK_CELLS = 4 * 1024 * 1024
+# Rows fetched per round trip while building
+BUILD_BATCH_SIZE = 10000
+
+
+class RecommendationsUnavailable(Exception):
+    """NumPy or SciPy is not installed."""
+
+
+def _int_array(np, *columns):
+    """Read integer columns into an (n, len(columns)) array.
+
+    Goes through the DB-API cursor: building a Row per table row would take
+    most of the build time.
+    """
+    cursor = db.session.connection().connection.cursor()
+    try:
+        cursor.execute(str(select(*columns).compile(dialect=db.session.get_bind().dialect)))
+        batches = iter(lambda: cursor.fetchmany(BUILD_BATCH_SIZE), [])
+        values = itertools.chain.from_iterable(itertools.chain.from_iterable(batches))
+        return np.fromiter(values, dtype=np.int64).reshape(-1, len(columns))
+    finally:
+        cursor.close()
+
+
+def build_snapshot():
+    """Compute each club's candidate books from the membership and club_book tables."""
+    try:
+        import numpy as np
+        from scipy import sparse
+    except ImportError:
+        raise RecommendationsUnavailable()
+
+    # Both tables are read in one transaction, so they agree with each other
+    memberships = _int_array(np, Membership.user_id, Membership.club_id)
+    club_books = _int_array(np, ClubBook.club_id, ClubBook.book_id, ClubBook.discussion_count)
+    db.session.close()
+
+    clubs = 1 + max(memberships[:, 1].max(initial=0), club_books[:, 0].max(initial=0))
+    users = 1 + memberships[:, 0].max(initial=0)
+    books = 1 + club_books[:, 1].max(initial=0)
+
+    members = sparse.csr_matrix((np.ones(len(memberships)), (memberships[:, 0], memberships[:, 1])),
+                                shape=(users, clubs))
+    # Scale each club's member column to unit length, so members^T members is the cosine similarity
+    sizes = np.asarray(members.sum(axis=0)).ravel()
+    scale = np.divide(1.0, np.sqrt(sizes), out=np.zeros(clubs), where=sizes > 0)
+    members = members @ sparse.diags(scale)
+    similarity = (members.T @ members).tocsr()
+    similarity.setdiag(0)
+    similarity.eliminate_zeros()
+    discussed = sparse.csr_matrix((np.log1p(club_books[:, 2]), (club_books[:, 0], club_books[:, 1])),
+                                  shape=(clubs, books))
+
+    # similarity @ discussed, a block of clubs at a time, keeping each row's best books
+    keep = min(CANDIDATES_PER_CLUB, books)
+    rows, columns, scores = [], [], []
+    block_size = max(1, BUILD_BLOCK_CELLS // books)
+    for start in range(0, clubs, block_size):
+        block = (similarity[start:start + block_size] @ discussed).toarray()
+        # The club's own books are never recommended to its members
+        own_rows, own_books = discussed[start:start + block_size].nonzero()
+        block[own_rows, own_books] = 0
+        best = np.argpartition(-block, keep - 1, axis=1)[:, :keep]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        rows.append(np.repeat(np.arange(start, start + len(block)), keep))
+        columns.append(best.ravel())
+        scores.append(best_scores.ravel())
+    candidates = sparse.csr_matrix((np.concatenate(scores), (np.concatenate(rows), np.concatenate(columns))),
+                                   shape=(clubs, books))
+    candidates.eliminate_zeros()
+    return Snapshot(candidates, discussed, time.monotonic())
+
+
+class Recommender:
+    """Rank books for a user from clubs whose members overlap with the user's clubs.
+
+    Clubs are similar by the cosine of their member sets. For each club, every
+    book scores the sum over the other clubs of their similarity times
+    log(1 + how often they discussed it), and its CANDIDATES_PER_CLUB best
+    books are kept. A user's recommendations are the sum of the candidates of
+    their clubs, leaving out the books their clubs already discussed, so a
+    request only adds up a few short rows. Keeping only the best books per
+    club makes the ranking approximate: a book that is never among them is
+    missed even if its scores across the user's clubs would add up.
+
+    The matrices are built in one vectorized pass over the membership and
+    club_book tables (club_book is kept by the club stats triggers) and held
+    in memory by each worker process. The first request builds them; once they
+    are older than RECOMMENDATIONS_TTL seconds the next request starts a
+    rebuild in a background thread and keeps answering from the old ones.
+    The user's own clubs are always read from the database, so joining a club
+    takes effect at once.
+
+    NumPy and SciPy are imported on the first build; without them the route
+    answers 503.
+    """
+
+    def __init__(self, app=None):
+        self.snapshot = None
+        self.lock = threading.Lock()
+        self.rebuilding = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RECOMMENDATIONS_TTL', 300.0)
+        app.extensions['recommender'] = self
+
+    def _rebuild(self, app):
+        try:
+            with app.app_context():
+                snapshot = build_snapshot()
+            self.snapshot = snapshot
+        except Exception:
+            app.logger.exception('Rebuilding the recommendation matrices failed')
+        finally:
+            self.rebuilding = False
+
+    def current(self):
+        """Return the snapshot, building it now if there is none and in the background if stale."""
+        snapshot = self.snapshot
+        if snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    self.snapshot = build_snapshot()
+                return self.snapshot
+        if time.monotonic() - snapshot.built_at > current_app.config['RECOMMENDATIONS_TTL']:
+            with self.lock:
+                if not self.rebuilding:
+                    self.rebuilding = True
+                    threading.Thread(target=self._rebuild, args=(current_app._get_current_object(),),
+                                     daemon=True).start()
+        return snapshot
+
+    def recommend(self, user_id, limit, fields):
+        """Return up to `limit` books for the user, best first, as `fields` dicts plus a score."""
+        snapshot = self.current()
+        club_ids = [club_id for club_id in db.session.execute(
+            select(Membership.club_id).where(Membership.user_id == user_id)).scalars()
+            if club_id < snapshot.candidates.shape[0]]
+        if not club_ids:
+            return []
+
+        import numpy as np
+        scores = snapshot.candidates[club_ids].sum(axis=0).A1
+        scores[snapshot.club_books[club_ids].indices] = 0
+        book_ids = np.flatnonzero(scores)
+        if len(book_ids) > limit:
+            book_ids = book_ids[np.argpartition(-scores[book_ids], limit - 1)[:limit]]
+        # Best first, ties by id
+        book_ids = book_ids[np.lexsort((book_ids, -scores[book_ids]))]
+        ranked = [(int(book_id), float(scores[book_id])) for book_id in book_ids]
+        if not ranked:
+            return []
+
+        rows = {row[0]: row[1:] for row in db.session.execute(
+            select(Book.id, *(getattr(Book, field) for field in fields))
+            .where(Book.id.in_([book_id for book_id, _ in ranked])))}
+        # A book deleted since the last build has no row
+        ranked = [(book_id, score) for book_id, score in ranked if book_id in rows]
+        items = serialize_rows((rows[book_id] for book_id, _ in ranked), fields)
+        for item, (_, score) in zip(items, ranked):
+            item['score'] = round(score, 6)
+        return items
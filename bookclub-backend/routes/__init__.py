@@ -0,0 +1,9 @@
+from routes import books, bulk, clubs, discussions, errors, memberships, monitoring, search, users
+
+BLUEPRINTS = (errors.bp, users.bp, clubs.bp, books.bp, memberships.bp, discussions.bp, bulk.bp, search.bp,
+              monitoring.bp)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
@@ -0,0 +1,50 @@
+from flask import Blueprint, jsonify, request
+
+from cache import cached
+from cascade import delete_cascade
+from models import db, Book
+from pagination import list_response
+from serializers import item_response, json_response, serialize
+
+bp = Blueprint('books', __name__)
+
+
+@bp.route('/books', methods=['GET', 'POST'])
+@cached('book')
+def handle_books():
+    if request.method == 'GET':
+        return list_response(Book)
+
+    elif request.method == 'POST':
+        data = request.json
+        if not all([data.get('title'), data.get('author'), data.get('genre'), data.get('user_id')]):
+            return jsonify({'message': 'Missing required fields'}), 400
+
+        new_book = Book(title=data['title'], author=data['author'], genre=data['genre'], user_id=data['user_id'])
+        db.session.add(new_book)
+        db.session.commit()
+        return json_response({'message': 'Book created!', 'book': serialize(new_book)}, 201)
+
+
+@bp.route('/books/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@cached('book')
+def handle_book(id):
+    book = Book.query.get(id)
+    if not book:
+        return jsonify({'message': 'Book not found'}), 404
+
+    if request.method == 'GET':
+        return item_response(book)
+
+    elif request.method == 'PUT':
+        data = request.json
+        book.title = data.get('title', book.title)
+        book.author = data.get('author', book.author)
+        book.genre = data.get('genre', book.genre)
+        db.session.commit()
+        return json_response({'message': 'Book updated!', 'book': serialize(book)})
+
+    elif request.method == 'DELETE':
+        delete_cascade(Book, Book.id == id)
+        db.session.commit()
+        return jsonify({'message': 'Book deleted!'})
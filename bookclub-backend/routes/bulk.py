@@ -0,0 +1,34 @@
+from flask import Blueprint, jsonify, request
+
+from bulk import BULK_MAX_ROWS, BULK_SPECS, bulk_create, bulk_delete, bulk_update
+from transfer import ClubImport, ImportFailed, import_records
+
+bp = Blueprint('bulk', __name__)
+
+
+@bp.route('/<any(users, books, memberships, discussions):resource>/bulk', methods=['POST', 'PUT', 'DELETE'])
+def handle_bulk(resource):
+    rows = request.json
+    if not isinstance(rows, list):
+        return jsonify({'message': 'Expected an array of rows'}), 400
+    if len(rows) > BULK_MAX_ROWS:
+        return jsonify({'message': f'At most {BULK_MAX_ROWS} rows per request'}), 400
+
+    spec = BULK_SPECS[resource]
+    if request.method == 'POST':
+        return jsonify(bulk_create(spec, rows).to_dict('created')), 201
+    elif request.method == 'PUT':
+        return jsonify(bulk_update(spec, rows).to_dict('updated'))
+    elif request.method == 'DELETE':
+        return jsonify(bulk_delete(spec, rows).to_dict('deleted'))
+
+
+@bp.route('/import', methods=['POST'])
+def handle_import():
+    importer = ClubImport()
+    try:
+        importer.run(import_records())
+    except ImportFailed as e:
+        # The chunks committed before the failing one are kept
+        return jsonify({'message': e.message, 'line': e.line, **importer.committed}), 400
+    return jsonify({'message': 'Import complete!', **importer.committed}), 201
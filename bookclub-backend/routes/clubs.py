@@ -0,0 +1,99 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from cache import cached
+from cascade import delete_cascade
+from models import db, Club, ClubStats, Discussion
+from pagination import list_response, timeline_response
+from serializers import invalid_fields_message, item_response, json_response, requested_fields, serialize
+from stats import club_stats
+from transfer import EXPORT_FORMATS, export_response
+
+bp = Blueprint('clubs', __name__)
+
+
+@bp.route('/clubs', methods=['GET', 'POST'])
+@cached('club')
+def handle_clubs():
+    if request.method == 'GET':
+        return list_response(Club)
+
+    elif request.method == 'POST':
+        data = request.json
+        if not all([data.get('name'), data.get('description')]):
+            return jsonify({'message': 'Missing required fields'}), 400
+
+        new_club = Club(name=data['name'], description=data['description'])
+        db.session.add(new_club)
+        db.session.commit()
+        return json_response({'message': 'Club created!', 'club': serialize(new_club)}, 201)
+
+
+@bp.route('/clubs/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@cached('club')
+def handle_club(id):
+    club = Club.query.get(id)
+    if not club:
+        return jsonify({'message': 'Club not found'}), 404
+
+    if request.method == 'GET':
+        return item_response(club)
+
+    elif request.method == 'PUT':
+        data = request.json
+        club.name = data.get('name', club.name)
+        club.description = data.get('description', club.description)
+        db.session.commit()
+        return json_response({'message': 'Club updated!', 'club': serialize(club)})
+
+    elif request.method == 'DELETE':
+        delete_cascade(Club, Club.id == id)
+        db.session.commit()
+        return jsonify({'message': 'Club deleted!'})
+
+
+@bp.route('/clubs/stats', methods=['GET'])
+@cached('club', 'membership', 'discussion')
+def handle_clubs_stats():
+    fields = requested_fields(ClubStats)
+    if fields is None:
+        return jsonify(invalid_fields_message(ClubStats)), 400
+    return json_response(club_stats(fields))
+
+
+@bp.route('/clubs/<int:id>/stats', methods=['GET'])
+@cached('club', 'membership', 'discussion')
+def handle_club_stats(id):
+    stats = ClubStats.query.get(id)
+    if not stats:
+        return jsonify({'message': 'Club not found'}), 404
+    return item_response(stats)
+
+
+@bp.route('/clubs/<int:id>/discussions/stream', methods=['GET'])
+def handle_club_discussion_stream(id):
+    if not Club.query.get(id):
+        return jsonify({'message': 'Club not found'}), 404
+    # EventSource sends Last-Event-ID when it reconnects; ?last_event_id= works for the first connection
+    last_event_id = request.headers.get('Last-Event-ID', request.args.get('last_event_id'))
+    if last_event_id is not None and not last_event_id.isdigit():
+        return jsonify({'message': 'Last-Event-ID must be a discussion id'}), 400
+    db.session.close()
+    return current_app.extensions['event_bus'].stream(id, None if last_event_id is None else int(last_event_id))
+
+
+@bp.route('/clubs/<int:id>/discussions', methods=['GET'])
+@cached('club', 'discussion')
+def handle_club_discussions(id):
+    if not Club.query.get(id):
+        return jsonify({'message': 'Club not found'}), 404
+    return timeline_response(Discussion, Discussion.club_id == id)
+
+
+@bp.route('/clubs/<int:id>/export', methods=['GET'])
+def handle_club_export(id):
+    format = request.args.get('format', 'ndjson')
+    if format not in EXPORT_FORMATS:
+        return jsonify({'message': 'format must be ndjson or csv'}), 400
+    if not Club.query.get(id):
+        return jsonify({'message': 'Club not found'}), 404
+    return export_response(id, format)
@@ -0,0 +1,74 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from cache import cached
+from models import db, Discussion
+from pagination import list_response
+from serializers import item_response, json_response, parse_date, serialize
+
+bp = Blueprint('discussions', __name__)
+
+
+@bp.route('/discussions', methods=['GET', 'POST'])
+@cached('discussion')
+def handle_discussions():
+    if request.method == 'GET':
+        return list_response(Discussion)
+
+    elif request.method == 'POST':
+        data = request.json
+        if not all([data.get('content'), data.get('book_id'), data.get('club_id'), data.get('date')]):
+            return jsonify({'message': 'Missing required fields'}), 400
+
+        date = parse_date(data['date'])
+        if date is None:
+            return jsonify({'message': 'date must be a date (YYYY-MM-DD)'}), 400
+
+        new_discussion = Discussion(
+            content=data['content'],
+            date=date,
+            book_id=data['book_id'],
+            club_id=data['club_id']
+        )
+        db.session.add(new_discussion)
+        db.session.commit()
+        discussion = serialize(new_discussion)
+        current_app.extensions['event_bus'].publish(new_discussion.club_id, 'created', discussion,
+                                                    id=new_discussion.id)
+        return json_response({'message': 'Discussion created!', 'discussion': discussion}, 201)
+
+
+@bp.route('/discussions/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@cached('discussion')
+def handle_discussion(id):
+    discussion = Discussion.query.get(id)
+    if not discussion:
+        return jsonify({'message': 'Discussion not found'}), 404
+    events = current_app.extensions['event_bus']
+
+    if request.method == 'GET':
+        return item_response(discussion)
+
+    elif request.method == 'PUT':
+        data = request.json
+        if 'date' in data:
+            date = parse_date(data['date'])
+            if date is None:
+                return jsonify({'message': 'date must be a date (YYYY-MM-DD)'}), 400
+            discussion.date = date
+        old_club_id = discussion.club_id
+        discussion.content = data.get('content', discussion.content)
+        discussion.book_id = data.get('book_id', discussion.book_id)
+        discussion.club_id = data.get('club_id', discussion.club_id)
+        db.session.commit()
+        updated = serialize(discussion)
+        if discussion.club_id != old_club_id:
+            events.publish(old_club_id, 'deleted', {'id': id})
+        events.publish(discussion.club_id, 'updated', updated)
+        return json_response({'message': 'Discussion updated!', 'discussion': updated})
+
+    elif request.method == 'DELETE':
+        club_id = discussion.club_id
+        db.session.delete(discussion)
+        db.session.commit()
+        events.publish(club_id, 'deleted', {'id': id})
+        return jsonify({'message': 'Discussion deleted!'})
@@ -0,0 +1,25 @@
+from flask import Blueprint, jsonify
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+from passwords import HashingBusy
+from recommendations import RecommendationsUnavailable
+
+bp = Blueprint('errors', __name__)
+
+
+@bp.app_errorhandler(IntegrityError)
+def handle_integrity_error(e):
+    # A missing referenced row or a duplicate unique value
+    db.session.rollback()
+    return jsonify({'message': 'Constraint violation', 'error': str(e.orig)}), 400
+
+
+@bp.app_errorhandler(HashingBusy)
+def handle_hashing_busy(e):
+    return jsonify({'message': 'Too many password checks in progress, retry later'}), 503, {'Retry-After': '1'}
+
+
+@bp.app_errorhandler(RecommendationsUnavailable)
+def handle_recommendations_unavailable(e):
+    return jsonify({'message': 'Recommendations need numpy and scipy, which are not installed'}), 503
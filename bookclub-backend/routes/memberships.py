@@ -0,0 +1,39 @@
+from flask import Blueprint, jsonify, request
+
+from cache import cached
+from models import db, User, Membership
+from serializers import json_response, serialize
+
+bp = Blueprint('memberships', __name__)
+
+
+@bp.route('/memberships', methods=['GET', 'POST'])
+@cached('membership', 'user')
+def handle_memberships():
+    if request.method == 'GET':
+        # One joined query instead of a User lookup per membership
+        query = db.session.query(Membership.user_id, Membership.club_id, Membership.role, User.name) \
+            .outerjoin(Membership.user)
+        for field in ('user_id', 'club_id'):
+            if field in request.args:
+                value = request.args.get(field, type=int)
+                if value is None:
+                    return jsonify({'message': f'{field} must be an integer'}), 400
+                query = query.filter(getattr(Membership, field) == value)
+
+        return json_response([{
+            'user_id': user_id,
+            'club_id': club_id,
+            'role': role,
+            'user_name': user_name
+        } for user_id, club_id, role, user_name in query])
+
+    elif request.method == 'POST':
+        data = request.json
+        if not all([data.get('user_id'), data.get('club_id'), data.get('role')]):
+            return jsonify({'message': 'Missing required fields'}), 400
+
+        membership = Membership(user_id=data['user_id'], club_id=data['club_id'], role=data['role'])
+        db.session.add(membership)
+        db.session.commit()
+        return json_response({'message': 'Membership created!', 'membership': serialize(membership)}, 201)
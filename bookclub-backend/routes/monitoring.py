@@ -0,0 +1,13 @@
+from flask import Blueprint, current_app, jsonify
+
+bp = Blueprint('monitoring', __name__)
+
+
+@bp.route('/cache/stats', methods=['GET'])
+def handle_cache_stats():
+    return jsonify(current_app.extensions['response_cache'].stats())
+
+
+@bp.route('/metrics', methods=['GET'])
+def handle_metrics():
+    return current_app.extensions['metrics'].render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
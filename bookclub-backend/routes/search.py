@@ -0,0 +1,31 @@
+from flask import Blueprint, jsonify, request
+
+from cache import cached
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from search import match_expression, search_books, search_discussions
+
+bp = Blueprint('search', __name__)
+
+
+@bp.route('/search', methods=['GET'])
+@cached('book', 'discussion')
+def handle_search():
+    match = match_expression(request.args.get('q', ''))
+    if not match:
+        return jsonify({'message': 'Missing search query'}), 400
+
+    kind = request.args.get('type')
+    if kind not in (None, 'books', 'discussions'):
+        return jsonify({'message': 'type must be books or discussions'}), 400
+
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if limit is None or not 1 <= limit <= MAX_PAGE_SIZE or offset is None or offset < 0:
+        return jsonify({'message': f'limit must be between 1 and {MAX_PAGE_SIZE} and offset must not be negative'}), 400
+
+    result = {}
+    if kind in (None, 'books'):
+        result['books'] = search_books(match, limit, offset)
+    if kind in (None, 'discussions'):
+        result['discussions'] = search_discussions(match, limit, offset)
+    return jsonify(result)
@@ -0,0 +1,98 @@
+from flask import Blueprint, current_app, jsonify, request
+from sqlalchemy import select, update
+
+from cache import cached
+from cascade import delete_cascade
+from models import db, User, Book
+from pagination import list_response
+from recommendations import DEFAULT_RECOMMENDATIONS, MAX_RECOMMENDATIONS
+from serializers import invalid_fields_message, item_response, json_response, requested_fields, serialize, \
+    serialize_rows
+
+bp = Blueprint('users', __name__)
+
+
+@bp.route('/users', methods=['GET', 'POST'])
+@cached('user')
+def handle_users():
+    if request.method == 'GET':
+        return list_response(User)
+
+    elif request.method == 'POST':
+        data = request.json
+        if not all([data.get('name'), data.get('email'), data.get('password')]):
+            return jsonify({'message': 'Missing required fields'}), 400
+        if not isinstance(data['password'], str):
+            return jsonify({'message': 'password must be a string'}), 400
+
+        password = current_app.extensions['password_hasher'].hash(data['password'])
+        new_user = User(name=data['name'], email=data['email'], password=password)
+        db.session.add(new_user)
+        db.session.commit()
+        return json_response({'message': 'User created!', 'user': serialize(new_user)}, 201)
+
+
+@bp.route('/users/<int:id>', methods=['GET', 'PUT', 'DELETE'])
+@cached('user')
+def handle_user(id):
+    user = User.query.get(id)
+    if not user:
+        return jsonify({'message': 'User not found'}), 404
+
+    if request.method == 'GET':
+        return item_response(user)
+
+    elif request.method == 'PUT':
+        data = request.json
+        if data.get('password'):
+            if not isinstance(data['password'], str):
+                return jsonify({'message': 'password must be a string'}), 400
+            # Release the write lock taken by the lookup while hashing
+            db.session.rollback()
+            user.password = current_app.extensions['password_hasher'].hash(data['password'])
+        user.name = data.get('name', user.name)
+        user.email = data.get('email', user.email)
+        db.session.commit()
+        return json_response({'message': 'User updated!', 'user': serialize(user)})
+
+    elif request.method == 'DELETE':
+        delete_cascade(User, User.id == id)
+        db.session.commit()
+        return jsonify({'message': 'User deleted!'})
+
+
+@bp.route('/users/<int:id>/recommendations', methods=['GET'])
+def handle_user_recommendations(id):
+    if not User.query.get(id):
+        return jsonify({'message': 'User not found'}), 404
+    fields = requested_fields(Book)
+    if fields is None:
+        return jsonify(invalid_fields_message(Book)), 400
+    limit = request.args.get('limit', DEFAULT_RECOMMENDATIONS, type=int)
+    if limit is None or not 1 <= limit <= MAX_RECOMMENDATIONS:
+        return jsonify({'message': f'limit must be between 1 and {MAX_RECOMMENDATIONS}'}), 400
+    return json_response({'items': current_app.extensions['recommender'].recommend(id, limit, fields)})
+
+
+@bp.route('/login', methods=['POST'])
+def handle_login():
+    data = request.json
+    if not all([data.get('email'), data.get('password')]):
+        return jsonify({'message': 'Missing required fields'}), 400
+    if not isinstance(data['email'], str) or not isinstance(data['password'], str):
+        return jsonify({'message': 'email and password must be strings'}), 400
+
+    row = db.session.execute(select(User.password, *(getattr(User, field) for field in User.api_fields))
+                             .where(User.email == data['email'])).first()
+    # A write request holds the database write lock from its first query; release it while hashing
+    db.session.rollback()
+    passwords = current_app.extensions['password_hasher']
+    matches, new_hash = passwords.verify(row.password if row else None, data['password'])
+    if not matches:
+        return jsonify({'message': 'Invalid email or password'}), 401
+    if new_hash:
+        # Plaintext from before hashing, or an older cost setting; skipped if the password changed meanwhile
+        db.session.execute(update(User).where(User.id == row.id, User.password == row.password)
+                           .values(password=new_hash))
+        db.session.commit()
+    return json_response({'message': 'Logged in!', 'user': serialize_rows([row[1:]], User.api_fields)[0]})
@@ -0,0 +1,80 @@
+import re
+from html import escape
+
+from models import db
+
+# Control characters FTS5 wraps around matched terms; swapped for <mark> once
+# the surrounding text has been HTML-escaped.
+_OPEN, _CLOSE = '\x02', '\x03'
+
+# bm25 column weights: a hit in the title counts more than one in the genre
+BOOK_WEIGHTS = (10.0, 5.0, 1.0)
+
+BOOK_SEARCH = db.text(f"""
+    SELECT book.id, book.title, book.author, book.genre,
+           highlight(book_fts, 0, :open, :close) AS title_match,
+           highlight(book_fts, 1, :open, :close) AS author_match,
+           bm25(book_fts, {', '.join(map(str, BOOK_WEIGHTS))}) AS score
+    FROM book_fts JOIN book ON book.id = book_fts.rowid
+    WHERE book_fts MATCH :match
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""")
+
+DISCUSSION_SEARCH = db.text("""
+    SELECT discussion.id, discussion.date, discussion.book_id, discussion.club_id,
+           snippet(discussion_fts, 0, :open, :close, '…', 16) AS snippet,
+           bm25(discussion_fts) AS score
+    FROM discussion_fts JOIN discussion ON discussion.id = discussion_fts.rowid
+    WHERE discussion_fts MATCH :match
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def match_expression(q):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Quoting each word keeps FTS5 operators and stray quotes in user input from
+    being parsed as query syntax.
+    """
+    words = re.findall(r'\w+', q)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words) + '*'
+
+
+def _marked(text):
+    return escape(text).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+def _page(statement, match, limit, offset):
+    rows = db.session.execute(statement, {
+        'match': match, 'open': _OPEN, 'close': _CLOSE, 'limit': limit + 1, 'offset': offset
+    }).mappings().all()
+    next_offset = offset + limit if len(rows) > limit else None
+    return rows[:limit], next_offset
+
+
+def search_books(match, limit, offset):
+    rows, next_offset = _page(BOOK_SEARCH, match, limit, offset)
+    return {'items': [{
+        'id': row['id'],
+        'title': row['title'],
+        'author': row['author'],
+        'genre': row['genre'],
+        'highlight': {'title': _marked(row['title_match']), 'author': _marked(row['author_match'])},
+        'score': row['score']
+    } for row in rows], 'next_offset': next_offset}
+
+
+def search_discussions(match, limit, offset):
+    rows, next_offset = _page(DISCUSSION_SEARCH, match, limit, offset)
+    return {'items': [{
+        'id': row['id'],
+        'date': row['date'],
+        'book_id': row['book_id'],
+        'club_id': row['club_id'],
+        'snippet': _marked(row['snippet']),
+        'score': row['score']
+    } for row in rows], 'next_offset': next_offset}
@@ -0,0 +1,79 @@
+import datetime
+import json
+
+from flask import current_app, jsonify, request
+
+try:
+    import orjson
+except ImportError:  # optional, several times faster than the json module
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(payload):
+    """Encode `payload` to JSON bytes with orjson when it is installed, the json module otherwise."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=_default).encode()
+
+
+def loads(data):
+    """Decode JSON text or bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def parse_date(value):
+    """Parse an ISO 8601 date, or the date part of an ISO 8601 datetime; None if `value` is neither."""
+    if isinstance(value, str) and (len(value) == 10 or value[10:11] in ('T', ' ')):
+        try:
+            return datetime.date.fromisoformat(value[:10])
+        except ValueError:
+            pass
+    return None
+
+
+def json_response(payload, status=200):
+    """Drop-in for jsonify() that goes through dumps()."""
+    return current_app.response_class(dumps(payload), status=status, mimetype='application/json')
+
+
+def requested_fields(model):
+    """Return the fields selected with ?fields=a,b (all of `model.api_fields` by default).
+
+    Returns None if the request names a field the model does not expose.
+    """
+    if 'fields' not in request.args:
+        return model.api_fields
+    fields = tuple(field for field in request.args['fields'].split(',') if field)
+    if not fields or any(field not in model.api_fields for field in fields):
+        return None
+    return fields
+
+
+def invalid_fields_message(model):
+    return {'message': 'fields must be a comma-separated subset of: ' + ','.join(model.api_fields)}
+
+
+def item_response(obj):
+    """Serialize one row for a GET by id, honouring ?fields=."""
+    fields = requested_fields(type(obj))
+    if fields is None:
+        return jsonify(invalid_fields_message(type(obj))), 400
+    return json_response(serialize(obj, fields))
+
+
+def serialize(obj, fields=None):
+    """Build the API representation of one ORM object."""
+    return {field: getattr(obj, field) for field in fields or obj.api_fields}
+
+
+def serialize_rows(rows, fields):
+    """Build API representations from row tuples whose columns follow `fields`."""
+    return [dict(zip(fields, row)) for row in rows]
@@ -0,0 +1,83 @@
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, distinct, func, insert, select
+
+from models import db, Club, ClubBook, ClubStats, Discussion, Membership
+from serializers import serialize_rows
+
+COUNTERS = ('member_count', 'discussion_count', 'book_count')
+
+
+def club_stats(fields):
+    """Return the stored counters of every club, in club id order, as `fields` dicts."""
+    return serialize_rows(db.session.execute(
+        select(*(getattr(ClubStats, field) for field in fields)).order_by(ClubStats.club_id)), fields)
+
+
+def _counted_stats():
+    # The counters recomputed with COUNT(*), one row per club
+    return select(
+        Club.id,
+        select(func.count()).where(Membership.club_id == Club.id).scalar_subquery(),
+        select(func.count()).where(Discussion.club_id == Club.id).scalar_subquery(),
+        select(func.count(distinct(Discussion.book_id))).where(Discussion.club_id == Club.id).scalar_subquery(),
+    )
+
+
+def _counted_club_books():
+    return select(Discussion.club_id, Discussion.book_id, func.count()) \
+        .group_by(Discussion.club_id, Discussion.book_id)
+
+
+def drift():
+    """Compare the stored counters with COUNT(*) and describe every difference."""
+    stored = {row[0]: tuple(row[1:]) for row in db.session.execute(
+        select(ClubStats.club_id, *(getattr(ClubStats, counter) for counter in COUNTERS)))}
+    counted = {row[0]: tuple(row[1:]) for row in db.session.execute(_counted_stats())}
+    problems = []
+    for club_id in sorted(stored.keys() | counted.keys()):
+        if club_id not in counted:
+            problems.append(f'club {club_id}: stats row for a club that does not exist')
+        elif club_id not in stored:
+            problems.append(f'club {club_id}: no stats row')
+        elif stored[club_id] != counted[club_id]:
+            problems.append(f'club {club_id}: ' + ', '.join(
+                f'{counter} {have} != {want}'
+                for counter, have, want in zip(COUNTERS, stored[club_id], counted[club_id]) if have != want))
+
+    stored_books = {(club_id, book_id): count for club_id, book_id, count in db.session.execute(
+        select(ClubBook.club_id, ClubBook.book_id, ClubBook.discussion_count))}
+    counted_books = {(club_id, book_id): count for club_id, book_id, count in db.session.execute(
+        _counted_club_books())}
+    if stored_books != counted_books:
+        wrong = sum(1 for key in stored_books.keys() | counted_books.keys()
+                    if stored_books.get(key) != counted_books.get(key))
+        problems.append(f'club_book: {wrong} (club, book) discussion counts are wrong')
+    return problems
+
+
+def rebuild():
+    """Recompute every counter from scratch, in one transaction."""
+    db.session.execute(delete(ClubBook))
+    db.session.execute(insert(ClubBook).from_select(['club_id', 'book_id', 'discussion_count'],
+                                                    _counted_club_books()))
+    db.session.execute(delete(ClubStats))
+    db.session.execute(insert(ClubStats).from_select(['club_id', *COUNTERS], _counted_stats()))
+    db.session.commit()
+
+
+@click.command('rebuild-stats')
+@click.option('--check', is_flag=True, help='Only compare the counters with COUNT(*); exit 1 if they differ.')
+@with_appcontext
+def rebuild_stats(check):
+    """Recompute the club stats counters, reporting any drift first."""
+    problems = drift()
+    for problem in problems:
+        click.echo(problem, err=True)
+    if check:
+        if problems:
+            raise SystemExit(1)
+        click.echo('Club stats match the tables.')
+        return
+    rebuild()
+    click.echo(f'Rebuilt club stats ({len(problems)} problems fixed).')
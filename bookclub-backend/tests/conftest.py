@@ -0,0 +1,86 @@
+"""Fixtures shared by the tests: an app per test, on its own migrated SQLite database.
+
+Run from bookclub-backend with `python -m pytest tests`.
+"""
+import os
+import shutil
+
+import pytest
+from flask import g
+from flask_migrate import upgrade
+
+from app import create_app
+from benchmarks.seed import seed
+from models import db
+
+
+def _create_app(path, **config):
+    return create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'TESTING': True, **config})
+
+
+def _dispose(app):
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def migrated_database(tmp_path_factory):
+    # Running the migrations takes a while, so every test starts from a copy of this file
+    path = tmp_path_factory.mktemp('template') / 'bookclub.db'
+    app = _create_app(path)
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, 'migrations'))
+    _dispose(app)
+    return path
+
+
+@pytest.fixture
+def make_app(migrated_database, tmp_path):
+    """Return a function that creates an app on a new database seeded with `counts` rows per table.
+
+    With `same_database_as`, the app uses that app's database instead, as another worker would.
+    """
+    apps = []
+
+    def make_app(config=None, same_database_as=None, **counts):
+        if same_database_as is not None:
+            path = same_database_as.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+        else:
+            path = tmp_path / f'bookclub-{len(apps)}.db'
+            shutil.copyfile(migrated_database, path)
+        app = _create_app(path, **(config or {}))
+        apps.append(app)
+        if counts:
+            with app.app_context():
+                seed({'users': 0, 'clubs': 0, 'books': 0, 'memberships': 0, 'discussions': 0, **counts})
+        return app
+
+    yield make_app
+    for app in apps:
+        _dispose(app)
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def count_statements(app, method, url, **kwargs):
+    """Run a request and return the number of SQL statements it ran, as counted by the metrics hooks."""
+    # The response cache would answer a repeated GET without any statement
+    app.config['RESPONSE_CACHE_MAX_BYTES'] = 0
+    with app.test_client() as client:
+        response = client.open(url, method=method, **kwargs)
+        assert response.status_code < 400, response.get_json()
+        return g.sql_statements
+
+
+@pytest.fixture
+def statements():
+    return count_statements
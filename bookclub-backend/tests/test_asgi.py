@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip('asgiref')
+
+from asgi_adapter import ThreadPoolWsgiToAsgi  # noqa: E402
+
+STREAM = '/clubs/1/discussions/stream'
+TIMEOUT = 5
+
+
+class Request:
+    """One HTTP request to an ASGI app, with the client side driven by the test."""
+
+    def __init__(self, app, method, path, body=None):
+        path, _, query = path.partition('?')
+        body = b'' if body is None else json.dumps(body).encode()
+        scope = {'type': 'http', 'http_version': '1.1', 'method': method, 'scheme': 'http', 'path': path,
+                 'root_path': '', 'query_string': query.encode(), 'server': ('testserver', 80),
+                 'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]}
+        self.incoming = asyncio.Queue()
+        self.incoming.put_nowait({'type': 'http.request', 'body': body})
+        self.status = None
+        self.chunks = asyncio.Queue()
+        self.task = asyncio.ensure_future(app(scope, self.incoming.get, self._send))
+
+    async def _send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+        elif message.get('body'):
+            await self.chunks.put(message['body'])
+
+    async def next_chunk(self):
+        return await asyncio.wait_for(self.chunks.get(), TIMEOUT)
+
+    async def finished(self):
+        await asyncio.wait_for(self.task, TIMEOUT)
+        return self.status
+
+    def disconnect(self):
+        self.incoming.put_nowait({'type': 'http.disconnect'})
+
+
+def test_open_streams_do_not_block_other_requests(make_app):
+    app = make_app({'SSE_HEARTBEAT_SECONDS': 0.2, 'SSE_MAX_STREAMS': 2}, users=5, clubs=1, books=5)
+    asgi_app = ThreadPoolWsgiToAsgi(app, threads=4)
+
+    async def scenario():
+        streams = [Request(asgi_app, 'GET', STREAM) for _ in range(2)]
+        for stream in streams:
+            assert (await stream.next_chunk()).startswith(b'retry:')
+
+        # The streams hold two of the four threads; the rest serve everything else
+        reads = [Request(asgi_app, 'GET', '/clubs/1') for _ in range(8)]
+        assert [await read.finished() for read in reads] == [200] * 8
+        post = Request(asgi_app, 'POST', '/discussions',
+                       {'content': 'Hello', 'date': '2025-01-01', 'book_id': 1, 'club_id': 1})
+        assert await post.finished() == 201
+        while b'event: created' not in await streams[0].next_chunk():
+            pass
+        assert await Request(asgi_app, 'GET', STREAM).finished() == 503
+
+        # A client leaving ends its stream at the next heartbeat and frees its slot
+        for stream in streams:
+            stream.disconnect()
+        for stream in streams:
+            await stream.finished()
+        again = Request(asgi_app, 'GET', STREAM)
+        assert (await again.next_chunk()).startswith(b'retry:')
+        again.disconnect()
+        await again.finished()
+
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.mark.parametrize('value', [['x'], {'x': 1}, 1, True])
+def test_non_string_values_fail_their_row_only(make_app, value):
+    client = make_app(users=2).test_client()
+    response = client.post('/books/bulk', json=[
+        {'title': 'Good', 'author': 'A', 'genre': 'G', 'user_id': 1},
+        {'title': value, 'author': 'B', 'genre': 'G', 'user_id': 2},
+    ])
+    assert response.status_code == 201
+    body = response.get_json()
+    assert len(body['created']) == 1
+    assert body['errors'] == [{'index': 1, 'errors': ['title must be a string']}]
+
+
+def test_non_string_values_fail_their_row_on_update(make_app):
+    client = make_app(users=2, books=2).test_client()
+    response = client.put('/books/bulk', json=[{'id': 1, 'title': 'Renamed'}, {'id': 2, 'genre': ['x']}])
+    assert response.status_code == 200
+    assert response.get_json()['errors'] == [{'index': 1, 'errors': ['genre must be a string']}]
+    assert client.get('/books/1').get_json()['title'] == 'Renamed'
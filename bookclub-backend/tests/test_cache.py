@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from models import db, Club
+
+
+def _club_names(client):
+    return [club['name'] for club in client.get('/clubs').get_json()]
+
+
+def test_writes_invalidate_the_cache_of_every_app(make_app):
+    # Two apps on one database stand in for two workers
+    first = make_app()
+    second = make_app(same_database_as=first)
+    first_client, second_client = first.test_client(), second.test_client()
+    assert _club_names(first_client) == _club_names(second_client) == []
+    etag = first_client.get('/clubs').headers['ETag']
+
+    assert second_client.post('/clubs', json={'name': 'Readers', 'description': 'A club'}).status_code == 201
+    assert _club_names(first_client) == _club_names(second_client) == ['Readers']
+    assert first_client.get('/clubs', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_cascaded_deletes_invalidate_the_cache(make_app):
+    client = make_app(users=10, clubs=2, memberships=10).test_client()
+    assert client.get('/memberships?club_id=1').get_json()
+    assert client.delete('/clubs/1').status_code < 400
+    assert client.get('/memberships?club_id=1').get_json() == []
+
+
+def test_failed_savepoint_keeps_earlier_writes_invalidating(make_app):
+    app = make_app()
+    client = app.test_client()
+    assert _club_names(client) == []
+    with app.app_context():
+        club = Club(name='Readers', description='A club')
+        db.session.add(club)
+        db.session.flush()
+        # As in bulk writes: a chunk fails inside its savepoint, the transaction goes on
+        with pytest.raises(IntegrityError):
+            with db.session.begin_nested():
+                db.session.execute(insert(Club), [{'id': club.id, 'name': 'Again', 'description': 'Duplicate'}])
+        db.session.commit()
+    assert _club_names(client) == ['Readers']
+
+
+def test_rolled_back_writes_keep_the_cache(make_app):
+    app = make_app()
+    client = app.test_client()
+    assert _club_names(client) == []
+    with app.app_context():
+        db.session.add(Club(name='Readers', description='A club'))
+        db.session.flush()
+        db.session.rollback()
+    cache = app.extensions['response_cache']
+    hits = cache.hits
+    assert _club_names(client) == []
+    assert cache.hits == hits + 1
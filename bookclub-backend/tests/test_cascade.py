@@ -0,0 +1,45 @@
+import pytest
+from sqlalchemy import func, select
+
+from models import db, Book, Club, Discussion, Membership, User
+
+SMALL = {'users': 10, 'clubs': 2, 'books': 10, 'memberships': 10, 'discussions': 10}
+LARGE = {'users': 1000, 'clubs': 2, 'books': 1000, 'memberships': 2000, 'discussions': 5000}
+
+
+def _count(model, condition):
+    return db.session.execute(select(func.count()).select_from(model).where(condition)).scalar()
+
+
+@pytest.mark.parametrize('url', ['/clubs/1', '/users/1', '/books/1'])
+def test_delete_statements_do_not_grow_with_dependents(make_app, statements, url):
+    small = statements(make_app(**SMALL), 'DELETE', url)
+    assert statements(make_app(**LARGE), 'DELETE', url) == small
+
+
+def test_delete_club_removes_its_rows(make_app):
+    app = make_app(**LARGE)
+    with app.app_context():
+        assert _count(Membership, Membership.club_id == 1) and _count(Discussion, Discussion.club_id == 1)
+
+    assert app.test_client().delete('/clubs/1').status_code == 200
+    with app.app_context():
+        assert _count(Club, Club.id == 1) == 0
+        assert _count(Membership, Membership.club_id == 1) == 0
+        assert _count(Discussion, Discussion.club_id == 1) == 0
+        assert _count(Membership, Membership.club_id == 2) > 0
+
+
+def test_delete_user_removes_their_books_and_discussions_of_them(make_app):
+    app = make_app(**LARGE)
+    with app.app_context():
+        user_id = db.session.get(Book, 1).user_id
+        books = db.session.execute(select(Book.id).where(Book.user_id == user_id)).scalars().all()
+        assert _count(Discussion, Discussion.book_id.in_(books))
+
+    assert app.test_client().delete(f'/users/{user_id}').status_code == 200
+    with app.app_context():
+        assert _count(User, User.id == user_id) == 0
+        assert _count(Membership, Membership.user_id == user_id) == 0
+        assert _count(Book, Book.user_id == user_id) == 0
+        assert _count(Discussion, Discussion.book_id.in_(books)) == 0
@@ -0,0 +1,25 @@
+STREAM = '/clubs/1/discussions/stream'
+
+
+def test_streams_over_the_cap_are_refused_until_one_closes(make_app):
+    client = make_app({'SSE_MAX_STREAMS': 2}, users=1, clubs=1).test_client()
+    # Unbuffered responses stay open until closed, like a connected client. They
+    # share this thread's context stack, so they are closed in reverse order.
+    first = client.get(STREAM, buffered=False)
+    second = client.get(STREAM, buffered=False)
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert client.get(STREAM, buffered=False).status_code == 503
+
+    second.close()
+    again = client.get(STREAM, buffered=False)
+    assert again.status_code == 200
+    again.close()
+    first.close()
+
+
+def test_stream_that_never_started_is_released(make_app):
+    client = make_app({'SSE_MAX_STREAMS': 1}, users=1, clubs=1).test_client()
+    for _ in range(3):
+        response = client.get(STREAM, buffered=False)
+        assert response.status_code == 200
+        response.close()
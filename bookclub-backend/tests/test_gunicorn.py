@@ -0,0 +1,100 @@
+import http.client
+import os
+import runpy
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+pytest.importorskip('gunicorn')
+
+STREAM = '/clubs/1/discussions/stream'
+TIMEOUT = 10
+
+
+def _settings(monkeypatch, app, worker_class):
+    monkeypatch.setenv('GUNICORN_WORKER_CLASS', worker_class)
+    return runpy.run_path(os.path.join(app.root_path, 'gunicorn.conf.py'))
+
+
+def test_only_thread_workers_preload_the_app(monkeypatch, app):
+    assert _settings(monkeypatch, app, 'gthread')['preload_app']
+    assert not _settings(monkeypatch, app, 'gevent')['preload_app']
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _serve(app, worker_class, port):
+    env = {**os.environ, 'DATABASE_URL': app.config['SQLALCHEMY_DATABASE_URI'], 'BIND': f'127.0.0.1:{port}',
+           'WEB_CONCURRENCY': '1', 'GUNICORN_WORKER_CLASS': worker_class, 'GUNICORN_THREADS': '2',
+           'PYTHONPATH': os.pathsep.join(sys.path)}
+    # In its own process group, so the workers can be killed with it
+    server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py'], cwd=app.root_path,
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                              start_new_session=True)
+    deadline = time.monotonic() + TIMEOUT
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                _stop(server)
+                pytest.fail(f'gunicorn did not start (exit code {server.poll()})')
+            time.sleep(0.1)
+
+
+def _stop(server):
+    # Even a quick shutdown waits for a worker thread stuck in a stream until its next heartbeat
+    os.killpg(server.pid, signal.SIGKILL)
+    server.wait(TIMEOUT)
+
+
+def _get(port, url):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=TIMEOUT)
+    connection.request('GET', url)
+    return connection, connection.getresponse()
+
+
+def test_gevent_worker_serves_more_idle_streams_than_threads(make_app):
+    pytest.importorskip('gevent')
+    app = make_app(users=1, clubs=1)
+    port = _free_port()
+    server = _serve(app, 'gevent', port)
+    streams = []
+    try:
+        # Five times the threads a gthread worker would have
+        for _ in range(10):
+            connection, response = _get(port, STREAM)
+            streams.append(connection)
+            assert response.status == 200
+            assert response.readline().startswith(b'retry:')
+        connection, response = _get(port, '/clubs')
+        assert response.status == 200
+        connection.close()
+    finally:
+        for connection in streams:
+            connection.close()
+        _stop(server)
+
+
+def test_gthread_worker_keeps_threads_for_other_requests(make_app):
+    app = make_app(users=1, clubs=1)
+    port = _free_port()
+    server = _serve(app, 'gthread', port)
+    try:
+        # Two threads with one reserved: a single stream, and the other thread still serves
+        connection, response = _get(port, STREAM)
+        assert response.status == 200
+        assert _get(port, STREAM)[1].status == 503
+        assert _get(port, '/clubs')[1].status == 200
+        connection.close()
+    finally:
+        _stop(server)
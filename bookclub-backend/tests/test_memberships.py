@@ -0,0 +1,10 @@
+import pytest
+
+SMALL = {'users': 20, 'clubs': 5, 'memberships': 20}
+LARGE = {'users': 500, 'clubs': 5, 'memberships': 2000}
+
+
+@pytest.mark.parametrize('url', ['/memberships', '/memberships?club_id=1', '/memberships?user_id=1'])
+def test_list_statements_do_not_grow_with_table_size(make_app, statements, url):
+    small = statements(make_app(**SMALL), 'GET', url)
+    assert statements(make_app(**LARGE), 'GET', url) == small
@@ -0,0 +1,9 @@
+import os
+
+from flask_migrate import check
+
+
+def test_models_match_migrations(app):
+    # Exits if autogenerate would emit anything, e.g. dropping the FTS5 tables
+    with app.app_context():
+        check(directory=os.path.join(app.root_path, 'migrations'))
@@ -0,0 +1,5 @@
+from query_plans import scans
+
+
+def test_hot_requests_use_indexes():
+    assert scans() == {}
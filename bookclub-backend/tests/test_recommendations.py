@@ -0,0 +1,74 @@
+import math
+from collections import defaultdict
+
+import pytest
+
+import recommendations
+from models import db, ClubBook, Membership
+
+pytest.importorskip('numpy')
+pytest.importorskip('scipy')
+
+
+def _brute_force(user_id):
+    """Score every book for the user straight from the definition in Recommender's docstring."""
+    members = defaultdict(set)
+    for member_id, club_id in db.session.query(Membership.user_id, Membership.club_id):
+        members[club_id].add(member_id)
+    discussed = defaultdict(dict)
+    for club_id, book_id, count in db.session.query(ClubBook.club_id, ClubBook.book_id, ClubBook.discussion_count):
+        discussed[club_id][book_id] = math.log1p(count)
+
+    def similarity(a, b):
+        return len(members[a] & members[b]) / math.sqrt(len(members[a]) * len(members[b]))
+
+    own_clubs = [club_id for club_id, users in members.items() if user_id in users]
+    own_books = {book_id for club_id in own_clubs for book_id in discussed[club_id]}
+    scores = defaultdict(float)
+    for club_id in own_clubs:
+        for other in members:
+            if other == club_id:
+                continue
+            for book_id, weight in discussed[other].items():
+                if book_id not in discussed[club_id]:
+                    scores[book_id] += similarity(club_id, other) * weight
+    ranked = [(book_id, score) for book_id, score in scores.items() if score and book_id not in own_books]
+    return sorted(ranked, key=lambda item: (-item[1], item[0]))
+
+
+def test_recommendations_match_a_brute_force_ranking(make_app, monkeypatch):
+    # Every book stays a candidate, so the ranking is exact
+    monkeypatch.setattr(recommendations, 'CANDIDATES_PER_CLUB', 1000)
+    app = make_app(users=30, clubs=8, books=40, memberships=60, discussions=300)
+    client = app.test_client()
+    limit = recommendations.MAX_RECOMMENDATIONS
+    checked = 0
+    for user_id in range(1, 31):
+        with app.app_context():
+            expected = _brute_force(user_id)[:limit]
+        items = client.get(f'/users/{user_id}/recommendations?limit={limit}').get_json()['items']
+        assert [item['id'] for item in items] == [book_id for book_id, _ in expected]
+        assert [item['score'] for item in items] == pytest.approx([score for _, score in expected], abs=1e-6)
+        checked += bool(items)
+    assert checked > 10
+
+
+def test_limit_keeps_the_best(make_app):
+    client = make_app(users=30, clubs=8, books=40, memberships=60, discussions=300).test_client()
+    items = client.get('/users/1/recommendations?limit=100').get_json()['items']
+    assert len(items) > 3
+    assert client.get('/users/1/recommendations?limit=3').get_json()['items'] == items[:3]
+
+
+def test_unknown_user_is_not_found(make_app):
+    client = make_app(users=1).test_client()
+    assert client.get('/users/999/recommendations').status_code == 404
+
+
+def test_user_without_clubs_gets_nothing(make_app):
+    client = make_app(users=10, clubs=3, books=10, memberships=15, discussions=50).test_client()
+    response = client.post('/users', json={'name': 'New', 'email': 'new@example.com', 'password': 'secret'})
+    user_id = response.get_json()['user']['id']
+    response = client.get(f'/users/{user_id}/recommendations')
+    assert response.status_code == 200
+    assert response.get_json() == {'items': []}
@@ -0,0 +1,21 @@
+import os
+import statistics
+
+from benchmarks.startup import FIRST_REQUEST_BUDGET_MS, STARTUP_BUDGET_MS, measure
+
+# Raise the budgets on slower machines rather than skipping the test
+BUDGETS = {
+    'startup_ms': float(os.environ.get('STARTUP_BUDGET_MS', STARTUP_BUDGET_MS)),
+    'first_request_ms': float(os.environ.get('FIRST_REQUEST_BUDGET_MS', FIRST_REQUEST_BUDGET_MS)),
+}
+RUNS = 3
+
+
+def test_startup_and_first_request_are_within_budget(make_app):
+    app = make_app(users=10, clubs=2, books=10, memberships=10, discussions=10)
+    path = app.config['SQLALCHEMY_DATABASE_URI'][len('sqlite:///'):]
+    # The first run also compiles bytecode; leave it out
+    measure(path)
+    runs = [measure(path) for _ in range(RUNS)]
+    medians = {phase: statistics.median(run[phase] for run in runs) for phase in BUDGETS}
+    assert all(medians[phase] <= budget for phase, budget in BUDGETS.items()), (medians, BUDGETS)
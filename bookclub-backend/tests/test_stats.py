@@ -0,0 +1,49 @@
+from sqlalchemy import select
+
+from models import db, Discussion, Membership
+from stats import drift
+
+
+def test_counters_match_after_mixed_writes(make_app):
+    app = make_app(users=50, clubs=4, books=20, memberships=100, discussions=300)
+    client = app.test_client()
+    with app.app_context():
+        discussions = db.session.execute(select(Discussion.id).order_by(Discussion.id)).scalars().all()
+        memberships = db.session.execute(select(Membership.user_id, Membership.club_id)).all()
+        export = client.get('/clubs/1/export').data
+
+    # Single rows
+    created = client.post('/discussions', json={'content': 'New', 'date': '2025-01-01', 'book_id': 1, 'club_id': 1})
+    assert created.status_code == 201
+    assert client.put(f'/discussions/{discussions[0]}', json={'club_id': 2, 'book_id': 3}).status_code == 200
+    assert client.delete(f'/discussions/{discussions[1]}').status_code == 200
+    assert client.post('/clubs', json={'name': 'Empty', 'description': 'No members'}).status_code == 201
+    joined = next((user_id, club_id) for user_id in range(1, 51) for club_id in range(1, 5)
+                  if (user_id, club_id) not in set(memberships))
+    assert client.post('/memberships', json={'user_id': joined[0], 'club_id': joined[1],
+                                             'role': 'member'}).status_code == 201
+
+    # Bulk
+    response = client.post('/discussions/bulk', json=[
+        {'content': f'Bulk {i}', 'date': '2025-02-01', 'book_id': i % 20 + 1, 'club_id': i % 4 + 1}
+        for i in range(50)])
+    assert response.status_code == 201 and not response.get_json()['errors']
+    response = client.put('/discussions/bulk', json=[{'id': id, 'club_id': 3, 'book_id': 5}
+                                                    for id in discussions[2:40]])
+    assert not response.get_json()['errors']
+    response = client.delete('/discussions/bulk', json=[{'id': id} for id in discussions[40:60]])
+    assert not response.get_json()['errors']
+    response = client.delete('/memberships/bulk', json=[{'user_id': user_id, 'club_id': club_id}
+                                                       for user_id, club_id in memberships[:20]])
+    assert not response.get_json()['errors']
+
+    # Cascades
+    assert client.delete('/clubs/2').status_code == 200
+    assert client.delete('/books/4').status_code == 200
+    assert client.delete('/users/5').status_code == 200
+
+    # Import, which writes with executemany
+    assert client.post('/import', data=export, content_type='application/x-ndjson').status_code == 201
+
+    with app.app_context():
+        assert drift() == []
@@ -0,0 +1,67 @@
+import pytest
+
+from models import db, Club, User
+from passwords import is_hashed
+from serializers import dumps
+from stats import drift
+
+
+def _import(client, export):
+    response = client.post('/import', data=export, content_type='application/x-ndjson')
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def test_import_recreates_an_exported_club(make_app):
+    app = make_app(users=30, clubs=3, books=20, memberships=40, discussions=100)
+    client = app.test_client()
+    members = len(client.get('/memberships?club_id=1').get_json())
+
+    body = _import(client, client.get('/clubs/1/export').data)
+    # Every user matches by email, so no user is created
+    assert body['created']['user'] == 0 and body['created']['membership'] == members
+    new_club = body['club_ids']['1']
+    assert len(client.get(f'/memberships?club_id={new_club}').get_json()) == members
+    with app.app_context():
+        assert drift() == []
+
+
+def test_import_invalidates_cached_memberships(make_app):
+    client = make_app(users=30, clubs=3, books=20, memberships=40, discussions=100).test_client()
+    before = len(client.get('/memberships').get_json())
+
+    body = _import(client, client.get('/clubs/1/export').data)
+    assert len(client.get('/memberships').get_json()) == before + body['created']['membership']
+
+
+def test_imported_users_cannot_log_in(make_app):
+    export = make_app(users=5, clubs=1, memberships=5).test_client().get('/clubs/1/export').data
+    app = make_app()
+    client = app.test_client()
+    assert _import(client, export)['created']['user'] > 0
+    with app.app_context():
+        user = db.session.query(User).first()
+        assert is_hashed(user.password)
+    for password in ('password', user.password, '!'):
+        assert client.post('/login', json={'email': user.email, 'password': password}).status_code == 401
+
+
+@pytest.mark.parametrize('name', [123, ['Readers'], {'name': 'Readers'}, True])
+def test_import_rejects_non_string_values(make_app, name):
+    app = make_app()
+    export = dumps({'type': 'club', 'id': 1, 'name': name, 'description': 'A club'}) + b'\n'
+    response = app.test_client().post('/import', data=export, content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert response.get_json()['message'] == 'name must be a string'
+    assert response.get_json()['line'] == 1
+    with app.app_context():
+        assert db.session.query(Club).count() == 0
+
+
+def test_csv_import_keeps_cells_as_strings(make_app):
+    app = make_app()
+    export = b'type,id,name,description\nclub,1,123,A club\n'
+    response = app.test_client().post('/import', data=export, content_type='text/csv')
+    assert response.status_code == 201, response.get_json()
+    with app.app_context():
+        assert db.session.query(Club.name).scalar() == '123'
@@ -0,0 +1,38 @@
+import pytest
+
+from models import db, User
+from passwords import is_hashed
+
+
+@pytest.mark.parametrize('password', [123, ['secret'], {'secret': 1}])
+def test_non_string_password_is_rejected(make_app, password):
+    app = make_app(users=1)
+    client = app.test_client()
+
+    response = client.post('/users', json={'name': 'A', 'email': 'a@example.com', 'password': password})
+    assert response.status_code == 400
+    assert client.put('/users/1', json={'password': password}).status_code == 400
+    assert client.post('/login', json={'email': 'user1@example.com', 'password': password}).status_code == 400
+    response = client.post('/users/bulk', json=[{'name': 'B', 'email': 'b@example.com', 'password': password}])
+    assert response.get_json()['errors'] == [{'index': 0, 'errors': ['password must be a string']}]
+    with app.app_context():
+        assert db.session.query(User).count() == 1
+
+
+def test_login(make_app):
+    client = make_app(users=1).test_client()
+    assert client.post('/login', json={'email': 'user1@example.com', 'password': 'password'}).status_code == 200
+    assert client.post('/login', json={'email': 'user1@example.com', 'password': 'wrong'}).status_code == 401
+
+
+def test_plaintext_password_logs_in_and_is_rehashed(make_app):
+    # Stored before hashing was introduced, whatever it looks like
+    app = make_app(users=1)
+    with app.app_context():
+        db.session.query(User).update({'password': '!bang'})
+        db.session.commit()
+    client = app.test_client()
+    assert client.post('/login', json={'email': 'user1@example.com', 'password': '!bang'}).status_code == 200
+    with app.app_context():
+        assert is_hashed(db.session.query(User.password).scalar())
+    assert client.post('/login', json={'email': 'user1@example.com', 'password': '!bang'}).status_code == 200
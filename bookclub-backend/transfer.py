@@ -0,0 +1,284 @@
+import csv
+import io
+
+from flask import Response, current_app, request, stream_with_context
+from sqlalchemy import Date, Integer, func, insert, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User, Club, Membership, Book, Discussion
+from pagination import STREAM_BATCH_SIZE
+from serializers import dumps, loads, parse_date
+
+# Record type -> (model, fields), in the order an export writes them. An import
+# must see a row before any record that references it, as an export does.
+RECORD_TYPES = {
+    'club': (Club, Club.api_fields),
+    'user': (User, User.api_fields),
+    'membership': (Membership, Membership.api_fields),
+    'book': (Book, Book.api_fields + ('user_id',)),
+    'discussion': (Discussion, Discussion.api_fields),
+}
+# Foreign key field -> the record type whose ids it holds
+REFERENCES = {'club_id': 'club', 'user_id': 'user', 'book_id': 'book'}
+# Every field of every record type, after the type, as CSV columns
+CSV_COLUMNS = ('type',) + tuple(dict.fromkeys(field for _, fields in RECORD_TYPES.values() for field in fields))
+EXPORT_FORMATS = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+# Records written per import transaction
+IMPORT_CHUNK_SIZE = 1000
+# Bytes of the upload read at a time
+UPLOAD_BUFFER_SIZE = 64 * 1024
+
+
+def _export_queries(club_id):
+    """One query per record type, selecting the rows of the club's export."""
+    member_ids = select(Membership.user_id).where(Membership.club_id == club_id)
+    book_ids = select(Discussion.book_id).where(Discussion.club_id == club_id)
+    owner_ids = select(Book.user_id).where(Book.id.in_(book_ids))
+    conditions = {
+        'club': Club.id == club_id,
+        # Passwords are never exported; imported users get an unusable one
+        'user': or_(User.id.in_(member_ids), User.id.in_(owner_ids)),
+        'membership': Membership.club_id == club_id,
+        'book': Book.id.in_(book_ids),
+        'discussion': Discussion.club_id == club_id,
+    }
+    for kind, (model, fields) in RECORD_TYPES.items():
+        order = model.__table__.primary_key.columns.values()
+        yield kind, fields, select(*(getattr(model, field) for field in fields)) \
+            .where(conditions[kind]).order_by(*order)
+
+
+def _ndjson_batch(kind, fields, rows):
+    return b''.join(dumps({'type': kind, **dict(zip(fields, row))}) + b'\n' for row in rows)
+
+
+def _csv_batch(kind, fields, rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, CSV_COLUMNS, lineterminator='\n')
+    if kind is None:
+        writer.writeheader()
+    writer.writerows({'type': kind, **dict(zip(fields, row))} for row in rows)
+    return buffer.getvalue().encode()
+
+
+def export_response(club_id, format):
+    """Stream every record of a club as NDJSON or CSV, one batch of rows at a time.
+
+    Each section is read with a streaming cursor (yield_per), so memory use
+    does not grow with the size of the club. All sections are read in the
+    same transaction, so the export is one consistent snapshot.
+    """
+    encode = _csv_batch if format == 'csv' else _ndjson_batch
+
+    def generate():
+        if format == 'csv':
+            yield encode(None, (), ())
+        for kind, fields, query in _export_queries(club_id):
+            result = db.session.execute(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            for batch in result.partitions():
+                yield encode(kind, fields, batch)
+        db.session.close()
+
+    return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[format], headers={
+        'Content-Disposition': f'attachment; filename=club-{club_id}.{format}'})
+
+
+class ImportFailed(Exception):
+    def __init__(self, line, message):
+        super().__init__(message)
+        self.line = line
+        self.message = message
+
+
+def _ndjson_records(stream):
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = loads(line)
+        except ValueError:  # also covers undecodable UTF-8
+            raise ImportFailed(line_number, 'Invalid JSON')
+        if not isinstance(record, dict):
+            raise ImportFailed(line_number, 'Record must be an object')
+        yield line_number, record
+
+
+def _csv_records(stream):
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    try:
+        for record in reader:
+            # Blank cells are the fields of other record types
+            yield reader.line_num, {key: value for key, value in record.items() if value not in ('', None)}
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise ImportFailed(reader.line_num + 1, f'Invalid CSV: {e}')
+
+
+class ClubImport:
+    """Write the records of an export, remapping their ids, a chunk at a time.
+
+    Records are buffered and written every `chunk_size` records, one
+    transaction per chunk, so memory use stays flat and the write lock is
+    released between chunks. Only the id maps of clubs, users and books are
+    kept for the whole import. Users whose email is already taken are matched
+    to the existing user instead of being created; new users get an unusable
+    password and must set one with PUT /users/<id>.
+
+    A failed chunk is rolled back; the chunks before it stay written.
+    """
+
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.pending = []
+        # record type -> {id in the file: id in the database}
+        self.ids = {kind: {} for kind in REFERENCES.values()}
+        self.created = {kind: 0 for kind in RECORD_TYPES}
+        self.matched_users = 0
+        # What the committed chunks wrote, which a failed chunk leaves as it was
+        self.committed = self.summary()
+
+    def run(self, records):
+        for line, record in records:
+            kind = record.get('type')
+            if kind not in RECORD_TYPES:
+                raise ImportFailed(line, 'type must be one of: ' + ', '.join(RECORD_TYPES))
+            self.pending.append((line, kind, self._values(line, kind, record)))
+            if len(self.pending) >= self.chunk_size:
+                self.flush()
+        self.flush()
+
+    def summary(self):
+        return {'club_ids': {str(old): new for old, new in self.ids['club'].items()},
+                'created': dict(self.created), 'matched_users': self.matched_users}
+
+    def _values(self, line, kind, record):
+        model, fields = RECORD_TYPES[kind]
+        values = {}
+        for field in fields:
+            value = record.get(field)
+            column_type = model.__table__.c[field].type
+            if value is None or value == '':
+                raise ImportFailed(line, f'Missing {kind} field: {field}')
+            if isinstance(column_type, Integer):
+                try:
+                    value = int(value)
+                except (TypeError, ValueError):
+                    raise ImportFailed(line, f'{field} must be an integer')
+            elif isinstance(column_type, Date):
+                value = parse_date(value)
+                if value is None:
+                    raise ImportFailed(line, f'{field} must be a date (YYYY-MM-DD)')
+            elif not isinstance(value, str):
+                # CSV cells are always strings; a JSON number, list or object is not a name
+                raise ImportFailed(line, f'{field} must be a string')
+            values[field] = value
+        return values
+
+    def flush(self):
+        """Write the pending records, referenced types first, and commit them."""
+        if not self.pending:
+            return
+        first_line = self.pending[0][0]
+        by_kind = {kind: [] for kind in RECORD_TYPES}
+        for line, kind, values in self.pending:
+            by_kind[kind].append((line, values))
+        self.pending = []
+        password_hashes = self._hash_new_user_passwords(by_kind['user'])
+        try:
+            self._write_rows('club', by_kind['club'])
+            self._write_users(by_kind['user'], password_hashes)
+            self._write_memberships(by_kind['membership'])
+            self._write_rows('book', by_kind['book'])
+            self._write_rows('discussion', by_kind['discussion'])
+        except ImportFailed:
+            db.session.rollback()
+            raise
+        except IntegrityError as e:
+            db.session.rollback()
+            raise ImportFailed(first_line, f'Constraint violation in the chunk starting here: {e.orig}')
+        db.session.commit()
+        self.committed = self.summary()
+
+    def _remap(self, line, values):
+        for field, kind in REFERENCES.items():
+            if field in values:
+                new_id = self.ids[kind].get(values[field])
+                if new_id is None:
+                    raise ImportFailed(line, f'{field} {values[field]} refers to a {kind} not defined before it')
+                values[field] = new_id
+        return values
+
+    def _next_id(self, model):
+        # The chunk's transaction holds the write lock, so these ids stay free until it commits
+        return db.session.execute(select(func.coalesce(func.max(model.id), 0))).scalar() + 1
+
+    def _write_rows(self, kind, records):
+        if not records:
+            return
+        model, _ = RECORD_TYPES[kind]
+        rows = [self._remap(line, values) for line, values in records]
+        if kind in self.ids:
+            next_id = self._next_id(model)
+            for offset, (line, values) in enumerate(records):
+                if values['id'] in self.ids[kind]:
+                    raise ImportFailed(line, f'Duplicate {kind} id: {values["id"]}')
+                self.ids[kind][values['id']] = values['id'] = next_id + offset
+        else:
+            for values in rows:
+                del values['id']
+        db.session.execute(insert(model), rows)
+        self.created[kind] += len(rows)
+
+    def _hash_new_user_passwords(self, records):
+        """Hash an unusable password for each user of `records` whose email is not taken yet."""
+        emails = {values['email'] for _, values in records}
+        if not emails:
+            return []
+        taken = db.session.execute(select(func.count()).where(User.email.in_(emails))).scalar()
+        # That query took the write lock; don't hold it while hashing
+        db.session.rollback()
+        return current_app.extensions['password_hasher'].hash_unusable(len(emails) - taken)
+
+    def _write_users(self, records, password_hashes):
+        if not records:
+            return
+        emails = {values['email'] for _, values in records}
+        existing = dict(db.session.execute(select(User.email, User.id).where(User.email.in_(emails))).all())
+        next_id = self._next_id(User)
+        rows = []
+        for line, values in records:
+            if values['id'] in self.ids['user']:
+                raise ImportFailed(line, f'Duplicate user id: {values["id"]}')
+            new_id = existing.get(values['email'])
+            if new_id is not None:
+                self.matched_users += 1
+            else:
+                # The first of several users sharing an email is created, the others match it
+                new_id = existing[values['email']] = next_id + len(rows)
+                if not password_hashes:
+                    # An email was freed after the hashes were counted
+                    password_hashes = current_app.extensions['password_hasher'].hash_unusable(1)
+                rows.append({'id': new_id, 'name': values['name'], 'email': values['email'],
+                             'password': password_hashes.pop()})
+            self.ids['user'][values['id']] = new_id
+        if rows:
+            db.session.execute(insert(User), rows)
+            self.created['user'] += len(rows)
+
+    def _write_memberships(self, records):
+        if not records:
+            return
+        rows = [self._remap(line, values) for line, values in records]
+        # Users merged by email can make two memberships one; the first wins. Through the
+        # session, so the response cache sees the write
+        result = db.session.execute(sqlite_insert(Membership.__table__).on_conflict_do_nothing(), rows)
+        self.created['membership'] += result.rowcount
+
+
+def import_records():
+    """Parse the request body as it arrives: CSV if sent as text/csv, NDJSON otherwise."""
+    # The WSGI input stream reads lines a byte at a time; buffer it
+    stream = io.BufferedReader(request.stream, UPLOAD_BUFFER_SIZE)
+    if request.mimetype == 'text/csv':
+        return _csv_records(stream)
+    return _ndjson_records(stream)
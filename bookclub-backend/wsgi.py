@@ -0,0 +1,9 @@
+"""Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Run migrations with the flask CLI (`flask db upgrade`), which uses app.create_app.
+"""
+from app import create_app
+
+app = create_app({'MIGRATIONS': False})